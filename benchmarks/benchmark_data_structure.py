@@ -0,0 +1,84 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+'''
+Timing of the DataStructure reductions on a large
+structure. Run it from the repository root with
+
+    python benchmarks/benchmark_data_structure.py [rows] [columns]
+'''
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from simpleplot.core.data.data_structure import DataStructure
+
+def build(rows, columns):
+    '''
+    Build a validated structure of rows x columns
+    objects, each linked to its own metadata.
+    '''
+    data = DataStructure()
+    for i in range(rows):
+        for j in range(columns):
+            data.addMetadataObject({'T':['T', 'float', str(i), 'K']})
+            data.addDataObject(np.zeros(16), [i, j])
+    data.validate()
+    return data
+
+def reduce(data, index):
+    '''
+    Reduce the structure and build the result, the
+    view alone is only a reference to the parent.
+    '''
+    return data[index].materialize()
+
+def timed(label, method, *args):
+    '''
+    Run the method once and print the wall time.
+    '''
+    start = time.perf_counter()
+    result = method(*args)
+    print("%-40s %10.4f s" % (label, time.perf_counter() - start))
+    return result
+
+if __name__ == '__main__':
+    rows    = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    columns = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    print("Structure of %i objects" % (rows * columns))
+    data = timed("build and validate", build, rows, columns)
+    timed("reduce one row", reduce, data, [rows // 2, '-'])
+    timed("reduce one column", reduce, data, ['-', columns // 2])
+    timed("process reduction of half the structure", data.process_reduction,
+        [slice(0, rows // 2), '-'], data.map[:rows // 2].flatten().tolist())
+    timed("remove every second row", data.remove_from_axis, 0,
+        [i % 2 for i in range(rows)])
+    timed("rebin the rows by 4", data.rebin, 0, 4, 'mean')
+
+    dense = DataStructure()
+    dense.adoptBuffer(np.random.rand(1000, 1000), 2)
+    timed("rebin 1M adopted points by 4", dense.rebin, 1, 4)
@@ -0,0 +1,97 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+'''
+Function evaluations and wall time of the fits 
+with the analytic jacobians of the functions and
+with finite differences. Run it from the 
+repository root with
+
+    python benchmarks/benchmark_fit_jacobian.py [peaks] [points]
+'''
+
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from simpleplot.core.fit.fit_worker import FitWorker
+
+def build(peaks, points, mode, use_jacobian):
+    '''
+    Build a fit worker of lorentzians on a baseline
+    started off their true positions.
+    '''
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 100, points)
+    positions = np.linspace(5, 95, peaks)
+    y = 1. + rng.normal(0, 0.05, points)
+    for position in positions:
+        y += 10 * 2**2 / ((x - position)**2 + 2**2)
+
+    worker = FitWorker()
+    worker.setXY([x], y)
+    for position in positions:
+        worker.addFunction('Lorenzian')
+        worker.func_dict['Lorenzian'][2][-1].paras = [position + 0.5, 1.5, 8., 0.]
+    worker.addFunction('Baseline')
+    worker.setParameters([0,1,2,3], 1 if mode == 'joint' else 3)
+    worker.setMode(mode)
+    worker.fitter.use_jacobian = use_jacobian
+    worker.fitter.functions = worker.func_dict
+    return worker
+
+def counted(method, counter):
+    '''
+    Count the calls of the residual function.
+    '''
+    def wrapper(*args):
+        counter[0] += 1
+        return method(*args)
+    return wrapper
+
+def timed(label, worker):
+    '''
+    Fit once and print the number of residual 
+    evaluations, finite differences included, and 
+    the wall time.
+    '''
+    counter = [0]
+    worker.fitter.residue = counted(worker.fitter.residue, counter)
+    worker.fitter.jointResidue = counted(worker.fitter.jointResidue, counter)
+    start = time.perf_counter()
+    worker.fitter.fit()
+    print("%-40s %8i nfev %10.4f s" % (label, counter[0], time.perf_counter() - start))
+
+if __name__ == '__main__':
+    peaks   = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    points  = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    print("%i lorentzians on %i points" % (peaks, points))
+    for mode in ['joint', 'sequential']:
+        for use_jacobian in [False, True]:
+            timed(
+                mode + (" analytic jacobian" if use_jacobian else " finite differences"),
+                build(peaks, points, mode, use_jacobian))
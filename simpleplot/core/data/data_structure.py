@@ -25,7 +25,27 @@
 #import general components
 import numpy as np
 import sys
+import os
 import copy
+import functools
+import threading
+
+from .slice_cache import SliceCache, slice_key
+from .metadata_table import MetadataTable
+
+def locked(method):
+    '''
+    Run a method of the structure under its lock. 
+    The methods that replace the map, the buffer or
+    the axes hold it, as do the reads of the worker
+    threads, so that a worker never sees these 
+    arrays while they are being replaced.
+    '''
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class DataStructure:
     '''
@@ -42,6 +62,7 @@ class DataStructure:
         class to link automatically the DataObject
         to the last created metadat instance. 
         '''
+        self.lock = threading.RLock()
         self.reset()
 
     def reset(self):
@@ -50,19 +71,28 @@ class DataStructure:
         to reuse it to load new data
         '''
         #start local variables
+        self.version            = getattr(self, 'version', 0) + 1
         self.id                 = 0
         self.meta_id            = 0
         self.DataObjects        = []
         self.data_addresses     = []
-        self.metaDataObjects    = []
+        self.meta_table         = MetadataTable()
         self.metadata_addresses = []
+        self.data_positions     = {}
+        self.metadata_positions = {}
         self.map                = None
-        self.slices             = {}
+        self.slices             = SliceCache()
         self.generated          = False
         self.axes               = None
+        self.buffer             = None
+        self.listeners          = []
+        self._map_store         = None
+        self._buffer_store      = None
 
         #logical variables
         self.add_meta_auto = True
+        self.dense_storage = False
+        self.storage_path  = None
 
         #own metadata
         self.metadata_class = Metadata(0)
@@ -71,6 +101,23 @@ class DataStructure:
         #save path
         self._save_path = None
 
+    def __getstate__(self):
+        '''
+        The listeners are bound to the live injectors
+        and are not carried over to copies.
+        '''
+        state = dict(self.__dict__)
+        state['listeners'] = []
+        state.pop('lock', None)
+        return state
+
+    def __setstate__(self, state):
+        '''
+        Copies get a lock of their own.
+        '''
+        self.__dict__.update(state)
+        self.lock = threading.RLock()
+
     def __str__(self):
         '''
         Generate a string output for the user to 
@@ -124,24 +171,25 @@ class DataStructure:
         - index = 'all' returns self as a copy
         - index = integer array returns data of DataObject
         - index = integer array with slices inside 
-                    returns a new datastructure with the
-                    corresponding elements. 
+                    returns a DataStructureView on the
+                    corresponding elements. Call its 
+                    materialize method to obtain a new
+                    datastructure.
         Input: 
         - index (int/slice array) position if the elements
         '''
+        if isinstance(index,int):
+            index = [index]
         if len(index) == 0 : return False
 
-        if isinstance(index,int):
-            id_array = self.axes.get_id_for_index([index])
-        else:
-            id_array = self.axes.get_id_for_index(index)
+        id_array = self.axes.get_id_for_index(index)
             
         if len(id_array) == 0:
             return False
         elif len(id_array) == 1: 
             return self.DataObjects[self.get_pos_from_id(id_array[0])].data
         else:
-            return self.process_reduction(index, id_array)
+            return DataStructureView(self, index)
 
     def get_metadata(self, index):
         '''
@@ -151,15 +199,16 @@ class DataStructure:
         si doing...
         '''
         DataObject = self.DataObjects[
-            self.data_addresses.index(
+            self.get_pos_from_id(
                 self.map.__getitem__(tuple(index)))]
         metadata_array = [
-            self.metaDataObjects[self.metadata_addresses.index(DataObject.meta_address[i])]
+            self.get_metaDataObject(DataObject.meta_address[i])
             for i in range(len(DataObject.meta_address))
         ]
 
         return metadata_array
 
+    @locked
     def validate(self):
         '''
         If all data objects have been loaded the 
@@ -170,6 +219,7 @@ class DataStructure:
         self.delete_all_slices()
         self.generate_axes()
         self.createMap()
+        self.createBuffer()
         self.generated = True
 
     def sanityCheck(self):
@@ -205,16 +255,190 @@ class DataStructure:
         - data (data)
         - index (int array)
         '''
+        self.data_positions[self.id] = len(self.DataObjects)
         self.DataObjects.append(
             DataObject(self.id, data, index, axes = axes))
         self.data_addresses.append(self.id)
+        self.version += 1
 
-        if self.add_meta_auto and not len(self.metaDataObjects) < 1 :
-            self.DataObjects[-1].meta_address.append(self.metaDataObjects[-1].meta_id)
-            self.metaDataObjects[-1].links.append(self.id)
+        if self.add_meta_auto and not len(self.meta_table) < 1 :
+            self.DataObjects[-1].meta_address.append(self.metadata_addresses[-1])
 
         self.id += 1
 
+    @locked
+    def append(self, data, index, axes = None):
+        '''
+        Add a data element to an already validated 
+        structure without running the validation. 
+        The map, the axes and the dense buffer are 
+        updated in place and grow geometrically when
+        a new coordinate shows up. The listeners are
+        then notified with the index that changed or
+        None if the axes had to grow.
+        Input: 
+        - data (data)
+        - index (int array)
+        '''
+        if not self.generated:
+            self.addDataObject(data, index, axes = axes)
+            self.validate()
+            self._notify(None)
+            return
+
+        index = [int(e) for e in index]
+        if not len(index) == self.axes.dim:
+            print("The index does not match the dimensionality")
+            return
+
+        self.addDataObject(data, index, axes = axes)
+        grown = self.axes.append(self.id - 1, index)
+
+        #place the id into the map
+        self._map_store = self._grow(
+            self._map_store, self.map, self.axes.axes_len, -1)
+        self.map = self._map_store[
+            tuple(slice(0, l) for l in self.axes.axes_len)]
+        self.map[tuple(index)] = self.id - 1
+        self.axes.map = self.map
+
+        #place the data into the buffer
+        if not self.buffer is None:
+            if not np.shape(data) == self.buffer.shape[self.axes.dim:]:
+                print("Data objects differ in shape, dense storage disabled")
+                self.releaseBuffer()
+            else:
+                store = self._grow(
+                    self._buffer_store, self.buffer, 
+                    self.axes.axes_len, 0, disk = True)
+                self.buffer = store[
+                    tuple(slice(0, l) for l in self.axes.axes_len)]
+                if not store is self._buffer_store:
+                    self._buffer_store = store
+                    for DataObject in self.DataObjects[:-1]:
+                        DataObject.data = self.buffer[tuple(DataObject.index)]
+                self.buffer[tuple(index)] = data
+                self.DataObjects[-1].data = self.buffer[tuple(index)]
+
+        self.slices.invalidate_point(slice_key([
+            self.axes.axes[i][index[i]] for i in range(self.axes.dim)]))
+        self._notify(None if grown else index)
+
+    def _allocate(self, shape, dtype, fill = 0, disk = False):
+        '''
+        Allocate an array either in memory or, if the
+        storage path is set and disk is True, as a 
+        memory map of a temporary file next to it. 
+        The temporary file replaces the storage file
+        once it is filled through _commitStore.
+        '''
+        if not disk or self.storage_path is None:
+            return np.full(tuple(shape), fill, dtype = dtype)
+
+        array = np.lib.format.open_memmap(
+            self.storage_path + '.tmp', mode = 'w+', 
+            dtype = dtype, shape = tuple(shape))
+        if not fill == 0:
+            array[...] = fill
+
+        return array
+
+    def _commitStore(self, store):
+        '''
+        Move a filled memory map allocated by 
+        _allocate onto the storage path and return
+        the map to use from then on. The maps still
+        open on the previous file stay valid. Where 
+        mapped files can not be replaced, as on 
+        windows, the maps of the structure are closed
+        first and the storage path is mapped again. 
+        Arrays taken from the previous map are then 
+        no longer valid.
+        '''
+        if not isinstance(store, np.memmap) or self.storage_path is None:
+            return store
+
+        store.flush()
+        try:
+            os.replace(self.storage_path + '.tmp', self.storage_path)
+            return store
+        except PermissionError:
+            pass
+
+        for array in [store, self._buffer_store, self.buffer]:
+            if not getattr(array, '_mmap', None) is None:
+                array._mmap.close()
+        self.buffer = None
+        self._buffer_store = None
+        os.replace(self.storage_path + '.tmp', self.storage_path)
+        return np.lib.format.open_memmap(self.storage_path, mode = 'r+')
+
+    def _grow(self, store, view, shape, fill, disk = False):
+        '''
+        Return a store able to hold the shape given
+        on its leading axes. The capacity is doubled
+        along every axis that is too short and the 
+        current content of the view is copied over.
+        Input: 
+        - store (ndarray) the allocated array
+        - view (ndarray) the used part of the store
+        - shape (int list) the required shape
+        - fill the value of unused elements
+        '''
+        if store is None or not np.may_share_memory(store, view):
+            store = view
+
+        capacity = list(store.shape[:len(shape)])
+        if all(l <= c for l, c in zip(shape, capacity)):
+            return store
+
+        capacity = [
+            c if l <= c else max(l, 2 * c) 
+            for l, c in zip(shape, capacity)]
+        new_store = self._allocate(
+            tuple(capacity) + store.shape[len(shape):], 
+            store.dtype, fill = fill, disk = disk)
+        new_store[tuple(slice(0, l) for l in view.shape)] = view
+
+        return self._commitStore(new_store)
+
+    def addListener(self, method):
+        '''
+        Register a method called with the changed 
+        region each time data is appended.
+        Input: 
+        - method (callable)
+        '''
+        if not method in self.listeners:
+            self.listeners.append(method)
+
+    def removeListener(self, method):
+        '''
+        Remove a registered listener
+        Input: 
+        - method (callable)
+        '''
+        if method in self.listeners:
+            self.listeners.remove(method)
+
+    def modified(self):
+        '''
+        Mark the structure as changed. Arrays that 
+        were assembled from an older version are 
+        then rebuilt. This has to be called after 
+        editing the data of the objects in place.
+        '''
+        self.version += 1
+
+    def _notify(self, region):
+        '''
+        Tell the listeners that the data changed. The
+        region is the index that changed or None if 
+        everything has to be reprocessed.
+        '''
+        for method in self.listeners:
+            method(region)
+
     def addMetadataObject(self,dictionary):
         '''
         Here we have a routine which will add an
@@ -223,7 +447,7 @@ class DataStructure:
         Input: 
         - dictionary (dict)
         '''
-        self.metaDataObjects.append(Metadata(self.meta_id, dictionary))
+        self.metadata_positions[self.meta_id] = self.meta_table.add(dictionary)
         self.metadata_addresses.append(self.meta_id)
         self.meta_id += 1
 
@@ -234,6 +458,7 @@ class DataStructure:
         Input: 
         - DataObject (DataObject)
         '''
+        self.data_positions[self.id] = len(self.DataObjects)
         self.DataObjects.append(copy.deepcopy(DataObject))
         self.DataObjects[-1].id = self.id 
         self.data_addresses.append(self.id)
@@ -246,22 +471,74 @@ class DataStructure:
         Input: 
         - meatdata (Metadata)
         '''
-        self.metaDataObjects.append(copy.deepcopy(metaDataObject))
-        self.metaDataObjects[-1].meta_id = self.meta_id
-        self.metadata_addresses.append(self.meta_id)
-        self.meta_id += 1
+        self.addMetadataObject(metaDataObject.metadata)
+
+    def injectMetadataTable(self, table):
+        '''
+        Append all the rows of a metadata table at 
+        once. The new rows get consecutive ids.
+        Input: 
+        - table (MetadataTable)
+        '''
+        start = len(self.meta_table)
+        self.meta_table.extend(table)
+        for i in range(len(table)):
+            self.metadata_positions[self.meta_id] = start + i
+            self.metadata_addresses.append(self.meta_id)
+            self.meta_id += 1
 
     def get_metaDataObject(self, address):
         '''
         Returns the proper metadata object for a given
-        address
+        address. It is built from the row of the table
+        and changing it does not change the table.
         Input: 
         - address (int)
         Output: 
         - metadata object (Metadata)
         '''
-        return self.metaDataObjects[self.metadata_addresses.index(address)]
+        return Metadata(
+            address, self.meta_table.row(self.metadata_positions[address]))
+
+    @property
+    def metaDataObjects(self):
+        '''
+        All the metadata objects of the structure.
+        '''
+        return [
+            self.get_metaDataObject(address) 
+            for address in self.metadata_addresses]
 
+    def get_meta_rows(self):
+        '''
+        Return for each DataObject the row of the 
+        table of its last metadata address or -1 if
+        it has none. The adopted objects of a linked
+        structure are not created for this, their 
+        metadata has their id. Appended objects are 
+        read from their own address.
+        Output: 
+        - rows (int ndarray) in the order of the 
+          DataObjects
+        '''
+        def row(DataObject):
+            if len(DataObject.meta_address) == 0:
+                return -1
+            return self.metadata_positions.get(DataObject.meta_address[-1], -1)
+
+        if (isinstance(self.DataObjects, DenseObjects) and self.DataObjects.linked 
+            and len(self.DataObjects._objects) == 0):
+            size = self.DataObjects._size
+            return np.asarray([
+                self.metadata_positions.get(address, -1) 
+                for address in self.data_addresses[:size]] + [
+                row(DataObject) for DataObject in self.DataObjects._appended], 
+                dtype = 'int64')
+
+        return np.asarray([
+            row(DataObject) for DataObject in self.DataObjects], dtype = 'int64')
+
+    @locked
     def createMap(self):
         '''
         This will create an axes class that will
@@ -272,6 +549,130 @@ class DataStructure:
         self.map = np.zeros(self.axes.axes_len, dtype = 'int64') -1
         for DataObject in self.DataObjects:
             self.map.__setitem__(tuple(DataObject.index),DataObject.id)
+        self._map_store = self.map
+        self.axes.map = self.map
+        self.modified()
+
+    def setDenseStorage(self, dense = True):
+        '''
+        Switch the storage mode of the structure. In 
+        dense mode all the DataObject payloads live in 
+        a single preallocated array shaped as the axes
+        followed by the data dimensions. The 
+        DataObjects then only hold views into it.
+        Input: 
+        - dense (bool)
+        '''
+        self.dense_storage = bool(dense)
+        if self.generated:
+            self.createBuffer()
+
+    def setStoragePath(self, path = None):
+        '''
+        Move the dense storage out of core. The 
+        buffer is then a numpy memory map of a .npy 
+        file at the given path and only the parts 
+        that are accessed are read from disk. The 
+        axes and the metadata remain in memory. Give
+        None to bring the buffer back into memory.
+        Input: 
+        - path (str) of the .npy file
+        '''
+        self.storage_path = None if path is None else os.path.abspath(path)
+        if not path is None:
+            self.dense_storage = True
+        if self.generated:
+            self.createBuffer()
+
+    @locked
+    def adoptBuffer(self, array, dim, axes = None, path = None):
+        '''
+        Build the structure around an existing array
+        without copying it. The leading dim axes of
+        the array are the axes of the structure and
+        the remaining ones the data of each object. 
+        This is how memory maps are opened without 
+        being loaded.
+        Input: 
+        - array (ndarray or memmap)
+        - dim (int) number of structure axes
+        - axes the axes of the DataObjects
+        - path (str) the storage path if the array
+          is the memory map of the store
+        '''
+        self.reset()
+        self.dense_storage = True
+        if not path is None:
+            self.storage_path = os.path.abspath(path)
+
+        shape = array.shape[:dim]
+        self.DataObjects    = DenseObjects(array, dim, axes = axes)
+        self.id             = len(self.DataObjects)
+        self.data_addresses = list(range(self.id))
+        self.data_positions = dict(zip(self.data_addresses, self.data_addresses))
+
+        self.map = np.arange(self.id, dtype = 'int64').reshape(shape)
+        self._map_store = self.map
+        self.axes = Axes(self, id_map = self.map)
+        self.axes.map = self.map
+        self.buffer = array
+        self._buffer_store = array
+        self.generated = True
+        self.modified()
+
+    def flush(self):
+        '''
+        Write the changes of an out of core buffer
+        to the disk.
+        '''
+        if isinstance(self.buffer, np.memmap):
+            self.buffer.flush()
+
+    @locked
+    def createBuffer(self):
+        '''
+        This will allocate the dense array following 
+        the map scheme and repoint the data of each 
+        DataObject to its view in the array. If the 
+        mode is not dense or the objects do not share
+        the same shape the buffer is dropped and the
+        objects keep their own data.
+        '''
+        if not self.dense_storage or len(self.DataObjects) == 0:
+            self.releaseBuffer()
+            return
+
+        dim = tuple(self.DataObjects[0].data.shape)
+        for DataObject in self.DataObjects:
+            if not DataObject.type == "np" or not DataObject.data.shape == dim:
+                print("Data objects differ in shape, dense storage disabled")
+                self.releaseBuffer()
+                return
+
+        buffer = self._allocate(
+            tuple(self.axes.axes_len) + dim,
+            self.DataObjects[0].data.dtype, 
+            disk = True)
+        for DataObject in self.DataObjects:
+            buffer[tuple(DataObject.index)] = DataObject.data
+        buffer = self._commitStore(buffer)
+        for DataObject in self.DataObjects:
+            DataObject.data = buffer[tuple(DataObject.index)]
+
+        self.buffer = buffer
+        self._buffer_store = buffer
+
+    @locked
+    def releaseBuffer(self):
+        '''
+        Give each DataObject its own copy of the data 
+        back and drop the dense array.
+        '''
+        if self.buffer is None: return
+        for DataObject in self.DataObjects:
+            DataObject.data = np.array(DataObject.data)
+        self.buffer = None
+        self._buffer_store = None
 
     def returnAsNumpy(self):
         '''
@@ -280,7 +681,13 @@ class DataStructure:
         improvements and does therefore not follow
         the practicality of the dataclass
         the ordering will follow the map scheme
+
+        In dense storage the buffer itself is returned
+        and no copy is performed.
         '''
+        if not self.buffer is None:
+            return self.buffer
+
         #evaluate total dimensionality
         dimensionality = self.axes.axes_len + list(self.DataObjects[0].dim)
 
@@ -307,6 +714,61 @@ class DataStructure:
         '''
         self.bufferedData = self.returnAsNumpy()
 
+    @locked
+    def returnSliceAsNumpy(self, index, order = None, cancelled = None):
+        '''
+        Return the numpy array of a selection without
+        assembling the entire data. The index has one
+        element per structure axis followed by one 
+        per data axis, each an integer or a slice. 
+        The objects on the selection are found in the
+        map and written straight into a preallocated 
+        array whose axes are already transposed.
+        Input: 
+        - index (int/slice array)
+        - order (int array) the axes of the selection
+          in the order of the output, as for 
+          np.transpose
+        - cancelled (method) polled while the objects
+          are read, None is returned once it is True
+        Output: 
+        - the array of the selection
+        '''
+        index       = tuple(index)
+        dim         = self.axes.dim
+        map_slice   = self.map[index[:dim]]
+        data_index  = index[dim:]
+
+        if not self.buffer is None:
+            selection = self.buffer[index]
+            if order is None:
+                return selection
+            output = np.empty(
+                [selection.shape[i] for i in order], dtype = selection.dtype)
+            np.copyto(output, selection.transpose(order))
+            return output
+
+        ids = map_slice[map_slice >= 0]
+        if ids.size == 0:
+            return None
+        sample = np.asarray(
+            self.DataObjects[self.get_pos_from_id(int(ids[0]))].data)[data_index]
+        shape = map_slice.shape + sample.shape
+        if order is None:
+            order = list(range(len(shape)))
+
+        output  = np.zeros([shape[i] for i in order], dtype = sample.dtype)
+        target  = output.transpose(np.argsort(order))
+        for position in np.argwhere(map_slice >= 0):
+            if not cancelled is None and cancelled():
+                return None
+            position = tuple(position)
+            DataObject = self.DataObjects[
+                self.get_pos_from_id(int(map_slice[position]))]
+            target[position] = np.asarray(DataObject.data)[data_index]
+
+        return output
+
     def generate_axes(self):
         '''
         This will create an axes class that will
@@ -324,7 +786,7 @@ class DataStructure:
         In this method we will locate the position of
         the element through the Id array
         '''
-        return self.data_addresses.index(idx)
+        return self.data_positions[idx]
 
     def get_pos_from_meta_id(self,id):
         '''
@@ -335,26 +797,29 @@ class DataStructure:
         Output: 
         - metadata (Metadata)
         '''
-        return self.metadata_addresses.index(id)
+        return self.metadata_positions[id]
 
-    def add_slice(self,array, data_structure):
+    def add_slice(self,array, data_structure, ids = None):
         '''
         This method will allow the user to generate 
         slices in advance to speed up the process. 
         This will allow that a repeated operation is
         not going to tax the ressources to much.
-        Some major operation on the dataset will 
-        obviously reset the slices. 
+        The slices are kept in a least recently used
+        cache bounded by a memory budget. 
         ———————
         Input: 
-        - 
-        ———————
-        Output: 
-        - datastructure
+        - array of values determining the slice
+        - data_structure to store
+        - ids (int array) of the source objects
         ———————
         status: active
         '''
-        self.slices[repr(array)] = data_structure
+        self.slices.add(
+            self._resolve_slice(array)[1], 
+            data_structure, 
+            ids     = ids, 
+            size    = data_structure.nbytes())
 
     def delete_all_slices(self):
         '''
@@ -364,12 +829,18 @@ class DataStructure:
         not going to tax the ressources to much.
         Some major operation on the dataset will 
         obviously reset the slices. 
-        Output: 
-        - datastructure
         '''
-        pointer = [key for key in self.slices.keys()]
-        for key in pointer:
-            del self.slices[key]
+        self.slices.clear()
+
+    def set_slice_budget(self, max_bytes):
+        '''
+        Set the memory budget in bytes of the slice
+        cache. The least recently used slices are
+        evicted beyond it.
+        Input: 
+        - max_bytes (int)
+        '''
+        self.slices.setBudget(max_bytes)
 
     def get_slice(self,array):
         '''
@@ -381,23 +852,69 @@ class DataStructure:
         Output: 
         - datastructure
         '''
-        #first check if it is already in the slice dictionary
-        if repr(array) in self.slices.keys():
-            return self.slices[repr(array)]
+        index, key = self._resolve_slice(array)
+
+        #first check if it is already in the slice cache
+        data_structure = self.slices.get(key)
+        if not data_structure is None:
+            return data_structure
 
         #or create it 
+        id_array = self.axes.get_id_for_index(index)
+        if len(id_array) == 0:
+            return False
+        else:
+            data_structure = DataStructureView(self, index)
+            data_structure.cache_key = key
+            self.slices.add(
+                key, data_structure, 
+                ids     = id_array, 
+                size    = id_array.nbytes + data_structure.nbytes())
+            return data_structure
+
+    def _resolve_slice(self, array):
+        '''
+        Convert the values given to get_slice into 
+        the index positions and the cache key. The 
+        key is built on the axis values so that it 
+        survives the renumbering of the axes.
+        Input: 
+        - array of values
+        Output: 
+        - index (list) and key (tuple)
+        '''
         index = []
+        key = []
         for i in range(self.axes.dim): 
             try:
                 index.append(self.axes.get_position(array[i],i))
+                key.append(self.axes.axes[i][index[-1]])
             except:
                 index.append('-')
-        id_array = self.axes.get_id_for_index(index)
-        if len(id_array) == 0:
-            return False
+                key.append('-')
+
+        return index, slice_key(key)
+
+    def nbytes(self):
+        '''
+        Evaluate the memory footprint of the data
+        held by the structure in bytes.
+        '''
+        if not self.buffer is None:
+            total = self.buffer.nbytes
         else:
-            self.add_slice(array, self.process_reduction(index, id_array))
-            return self.slices[repr(array)]
+            total = 0
+            for DataObject in self.DataObjects:
+                if DataObject.type == "np":
+                    total += DataObject.data.nbytes
+                else:
+                    total += sys.getsizeof(DataObject.data)
+
+        if not self.map is None:
+            total += self.map.nbytes
+        total += self.meta_table.nbytes()
+
+        return total
 
     def process_reduction(self,index, id_array):
         '''
@@ -430,6 +947,7 @@ class DataStructure:
             DataObject.index = list(new_index)
 
         #validate the structure
+        new_data.dense_storage = self.dense_storage
         new_data.validate()
 
         ##############################################
@@ -449,32 +967,19 @@ class DataStructure:
         ##############################################
         ##############################################
         #transfer the metadata 
-        metadata_idx = []
-        for DataObject in new_data.DataObjects:
-            for element in DataObject.meta_address:
-                metadata_idx.append(element)
-
-        #copy the right elements
-        metadata_idx_sorted = list(set(metadata_idx))
-        for idx in metadata_idx_sorted:
-            new_data.injectMetaDataObject(
-                self.metaDataObjects[self.get_pos_from_meta_id(idx)])
+        addresses = list(dict.fromkeys(
+            address for DataObject in new_data.DataObjects
+            for address in DataObject.meta_address))
+        metadata_equivalence = {
+            address : new_data.meta_id + i for i, address in enumerate(addresses)}
+        new_data.injectMetadataTable(self.meta_table.take([
+            self.get_pos_from_meta_id(address) for address in addresses]))
 
         #rebuild the right id links in the DataObjects
         for DataObject in new_data.DataObjects:
-            for i in range(len(DataObject.meta_address)):
-                DataObject.meta_address[i] = new_data.metadata_addresses[
-                    metadata_idx_sorted.index(
-                        DataObject.meta_address[i])]
-
-        #erase and rebuild links
-        for metaDataObject in new_data.metaDataObjects:
-            metaDataObject.links = []
-        for DataObject in new_data.DataObjects:
-            for element in DataObject.meta_address:
-                new_data.metaDataObjects[
-                    new_data.get_pos_from_meta_id(element)].links.append(
-                        int(DataObject.id))
+            DataObject.meta_address = [
+                metadata_equivalence[address] 
+                for address in DataObject.meta_address]
         
         #the local metadata
         new_data.metadata_class = copy.deepcopy(self.metadata_class)
@@ -499,73 +1004,89 @@ class DataStructure:
         - array is the array of elements to delete
         '''
         new_data        = copy.deepcopy(self)
+        new_data.storage_path = None
         remove_array    = new_data.axes.prepare_remove(idx, array)
 
-        for element in remove_array:
-            new_data.remove_data(element)
-            new_data.unlink_metadata(element)
-            new_data.axes.remove_from_axes(element)
+        new_data.remove_data(remove_array)
+        new_data.unlink_metadata(remove_array)
+        new_data.axes.remove_from_axes(remove_array)
 
         new_data.clean_metadata()
         equivalence = new_data.axes.clean_axes()
         new_data.clean_data(equivalence)
 
-        new_data.create_map()
+        new_data.createMap()
+        new_data.createBuffer()
 
         return new_data
     
+    @locked
     def remove_data(self, idx):
         '''
-        remove a single element from the data
-        structure through the use of its unique ID
+        remove elements from the data structure 
+        through the use of their unique ID. A list of
+        ids can be given to remove them in one pass.
         Input:
-        - DataObject unique identifier (int)
+        - DataObject unique identifier (int or list)
         '''
-        index = self.data_addresses.index(idx)
+        remove = set(_asIdList(idx))
+        keep = [
+            i for i, address in enumerate(self.data_addresses)
+            if not address in remove]
 
-        del(self.DataObjects[index])
-        del(self.data_addresses[index])
+        self.DataObjects    = [self.DataObjects[i] for i in keep]
+        self.data_addresses = [self.data_addresses[i] for i in keep]
+        self.data_positions = {
+            address : i for i, address in enumerate(self.data_addresses)}
+
+        self.slices.invalidate(list(remove))
+        self.modified()
 
     def unlink_metadata(self, idx):
         '''
-        Remove the links in the metadata objects. 
-        metadata objects which are orphaned will later
-        be cleaned
+        Remove the links of the DataObjects to their
+        metadata. Metadata which is orphaned will 
+        later be cleaned. Objects that were already 
+        removed are not linked anymore.
         Input:
-        - DataObject unique identifier (int)
+        - DataObject unique identifier (int or list)
         '''
-        for metaDataObject in self.metaDataObjects:
-            if idx in metaDataObject.links:
-                index = metaDataObject.links.index(idx)
-                del(metaDataObject.links[index])
+        for element in _asIdList(idx):
+            if element in self.data_positions:
+                self.DataObjects[self.get_pos_from_id(element)].meta_address = []
         
     def clean_metadata(self):
         '''
         This function will go through the metadata and
-        mark which ones to delete the 
+        remove the rows that no DataObject links to
         '''
-        orphaned = []
-
-        for metaDataObject in self.metaDataObjects:
-            if len(metaDataObject.links) == 0:
-                orphaned.append(metaDataObject.meta_id)
+        linked = set(
+            address for DataObject in self.DataObjects 
+            for address in DataObject.meta_address)
+        keep = [
+            i for i, address in enumerate(self.metadata_addresses)
+            if address in linked]
 
-        for idx in orphaned:
-            if idx in self.metadata_addresses:
-                index = self.metadata_addresses.index(idx)
-                del(self.metaDataObjects[index])
-                del(self.metadata_addresses[index])
+        self.meta_table         = self.meta_table.take(keep)
+        self.metadata_addresses = [self.metadata_addresses[i] for i in keep]
+        self.metadata_positions = {
+            address : i for i, address in enumerate(self.metadata_addresses)}
 
+    @locked
     def clean_data(self, equivalence):
         '''
         This function will repair the indices in the 
         DataObjects to match the restructured indices
         '''
+        lookup = [
+            {old : new for new, old in enumerate(axis)}
+            for axis in equivalence]
+
         for DataObject in self.DataObjects:
 
             for i in range(len(DataObject.index)):
 
-                DataObject.index[i] = equivalence[i].index(DataObject.index[i])
+                DataObject.index[i] = lookup[i][DataObject.index[i]]
 
     def sum_in_order(self, increment = 2, sum_metadata = True):
         '''
@@ -588,13 +1109,19 @@ class DataStructure:
                 summed_object += self.DataObjects[idx_0 + idx_1]
             self.injectDataObject(summed_object)
 
-        #current length of the objects array
+        #average the metadata of each sum in one pass
         if sum_metadata:
-            for element in self.DataObjects[current_data_length:]:
-                new_meta = self.sum_metadata(element)
-                new_meta.links = [element.id]
-                self.injectMetaDataObject(new_meta)
-                element.meta_address = [self.metaDataObjects[-1].meta_id]
+            summed = self.DataObjects[current_data_length:]
+            rows = [
+                self.get_pos_from_meta_id(address) 
+                for element in summed for address in element.meta_address]
+            sizes = [len(element.meta_address) for element in summed]
+            if len(rows) > 0 and min(sizes) > 0:
+                start = self.meta_id
+                self.injectMetadataTable(self.meta_table.average(
+                    rows, np.cumsum([0] + sizes[:-1])))
+                for i, element in enumerate(summed):
+                    element.meta_address = [start + i]
 
         self.validate()
 
@@ -603,13 +1130,89 @@ class DataStructure:
             element.id 
             for element in self.DataObjects[:current_data_length]]
 
-        for element in purge_list:
-            self.remove_data(element)
-            self.unlink_metadata(element)
-            self.axes.remove_from_axes(element)
+        self.remove_data(purge_list)
+        self.unlink_metadata(purge_list)
+        self.axes.remove_from_axes(purge_list)
 
         self.clean()
 
+    def rebin(self, axis, bins, reducer = 'sum'):
+        '''
+        Bin the structure along one axis on the dense
+        array. The bins are either given by a factor
+        or by the positions at which each bin starts.
+        The axis coordinates and the numeric metadata
+        are averaged over each bin while the other 
+        metadata is taken from the first member. 
+        Empty cells of the map do not count towards 
+        the mean.
+        Input: 
+        - axis (int or str) the axis or its name
+        - bins (int or int array) factor or edges
+        - reducer (str) 'sum' or 'mean'
+        Output: 
+        - the binned DataStructure
+        '''
+        if not self.generated:
+            print("The structure has to be validated before rebinning")
+            return None
+        if not reducer in ['sum', 'mean']:
+            print("The reducer has to be 'sum' or 'mean'")
+            return None
+
+        if isinstance(axis, str):
+            axis = self.axes.names.index(axis)
+        length = self.axes.axes_len[axis]
+
+        if isinstance(bins, (int, np.integer)):
+            edges = np.arange(0, length, max(int(bins), 1))
+        else:
+            edges = np.asarray(bins, dtype = 'int64')
+        if (edges.size == 0 or edges[0] < 0 or edges[-1] >= length 
+            or np.any(np.diff(edges) <= 0)):
+            print("The bin edges have to be increasing and within the axis")
+            return None
+
+        #bin the data and count the occupied cells
+        data = self.returnAsNumpy()
+        occupied = (self.map >= 0).astype('int64')
+        counts = np.add.reduceat(occupied, edges, axis = axis)
+        binned = np.add.reduceat(data, edges, axis = axis)
+        if reducer == 'mean':
+            binned = binned / np.maximum(counts, 1).reshape(
+                counts.shape + (1,) * (binned.ndim - counts.ndim))
+
+        new_data = DataStructure()
+        new_data.add_meta_auto = self.add_meta_auto
+        new_data.adoptBuffer(
+            binned, self.axes.dim, axes = self.DataObjects[0].axes)
+
+        #average the coordinates of the binned axis
+        widths = np.diff(np.append(edges, length))
+        for i in range(self.axes.dim):
+            new_data.axes.names[i] = self.axes.names[i]
+            new_data.axes.units[i] = self.axes.units[i]
+            new_data.axes.types[i] = self.axes.types[i]
+            values = list(self.axes.axes[i])
+            if i == axis:
+                try:
+                    values = (np.add.reduceat(
+                        np.asarray(values, dtype = 'float64'), edges) / widths).tolist()
+                except (TypeError, ValueError):
+                    values = [values[e] for e in edges]
+            new_data.axes.axes[i] = values
+
+        if len(self.meta_table) > 0:
+            by_id = np.full(self.id, -1, dtype = 'int64')
+            by_id[np.asarray(self.data_addresses, dtype = 'int64')] = self.get_meta_rows()
+            rows = np.where(self.map >= 0, by_id[self.map], -1)
+            new_data.injectMetadataTable(
+                self.meta_table.average(rows, edges, axis = axis))
+            new_data.DataObjects.link()
+
+        return new_data
+
+    @locked
     def clean(self):
         '''
         Will process the cleaning mechanisms.
@@ -618,6 +1221,7 @@ class DataStructure:
         equivalence = self.axes.clean_axes()
         self.clean_data(equivalence)
         self.createMap()
+        self.createBuffer()
 
     def sum_metadata(self,DataObject):
         '''
@@ -628,17 +1232,12 @@ class DataStructure:
         approach only summing the keys present in both
         and combine the rest...
         '''
-        links = DataObject.meta_address
-        summed_object = self.metaDataObjects[
-            self.metadata_addresses.index(links[0])]
+        rows = [
+            self.get_pos_from_meta_id(address) 
+            for address in DataObject.meta_address]
+        summed_table = self.meta_table.average(rows, [0])
 
-        for idx_1 in range(1, len(links)):
-            summed_object += self.metaDataObjects[
-            self.metadata_addresses.index(links[idx_1])]
-
-        summed_object = summed_object / len(links)
-
-        return summed_object
+        return Metadata(DataObject.meta_address[0], summed_table.row(0))
 
     def get_axis(self,axis_name):
         '''
@@ -702,6 +1301,251 @@ class DataStructure:
         else:
             return None
 
+class DataStructureView:
+    '''
+    This is a lightweight reduction of a 
+    DataStructure. It only holds a reference to the
+    parent and the index expression selecting the
+    elements. The data is read from the parent on
+    demand so that creating it costs nothing 
+    regardless of the size of the selection.
+
+    Integer elements of the index are remembered by
+    their axis value so that the view follows the
+    parent when its axes are renumbered. Slices are
+    kept as positions.
+    '''
+    def __init__(self, parent, index):
+        '''
+        Input: 
+        - parent (DataStructure)
+        - index (int/slice array) as for __getitem__
+        '''
+        self.parent     = parent
+        self.generated  = True
+        self._index     = []
+        self._values    = []
+
+        for i in range(parent.axes.dim):
+            element = index[i] if i < len(index) else '-'
+            if isinstance(element, str) and element == '-':
+                self._index.append(slice(None))
+                self._values.append(None)
+            elif isinstance(element, slice):
+                self._index.append(element)
+                self._values.append(None)
+            else:
+                self._index.append(int(element))
+                self._values.append(parent.axes.axes[i][int(element)])
+
+        self._map       = parent.map
+        self._version   = parent.version
+        self._data      = None
+        self.cache_key  = None
+        self.axes       = AxesView(self)
+
+    def __str__(self):
+        '''
+        Generate a string output for the user to 
+        see what the view is pointing at.
+        '''
+        output ="\n##########################################################\n"
+        output += "################ DATA STRUCTURE VIEW #####################\n"
+        output += "##########################################################\n"
+        output += "- The index into the parent is: "+str(self.index)+"\n"
+        output += "- The axes names are: "+str(self.axes.names)+"\n"
+        output += "- The axes lengths are: "+str(self.axes.axes_len)+"\n"
+        output += "##########################################################\n\n"
+
+        return output
+
+    @property
+    def index(self):
+        '''
+        The index expression into the parent. If the 
+        parent changed the assembled data is dropped
+        and if its map was rebuilt the integer 
+        elements are located again through their 
+        values.
+        '''
+        if not self._version == self.parent.version:
+            if not self._map is self.parent.map:
+                for i, value in enumerate(self._values):
+                    if not value is None:
+                        self._index[i] = self.parent.axes.get_position(value, i)
+                self._map   = self.parent.map
+            self._version   = self.parent.version
+            self._data      = None
+
+        return self._index
+
+    @property
+    def map(self):
+        '''
+        The id map of the selection as a view into 
+        the parent map.
+        '''
+        return self.parent.map[tuple(self.index)]
+
+    @property
+    def DataObjects(self):
+        '''
+        The DataObjects of the parent that are part
+        of the selection. Note that their index 
+        refers to the parent axes.
+        '''
+        return [
+            self.parent.DataObjects[self.parent.get_pos_from_id(idx)]
+            for idx in self.ids()]
+
+    @property
+    def metadata_class(self):
+        return self.parent.metadata_class
+
+    @property
+    def metadata(self):
+        return self.parent.metadata
+
+    @property
+    def metaDataObjects(self):
+        '''
+        The metadata objects linked to the selection.
+        '''
+        addresses = []
+        for DataObject in self.DataObjects:
+            for address in DataObject.meta_address:
+                if not address in addresses:
+                    addresses.append(address)
+        return [self.parent.get_metaDataObject(address) for address in addresses]
+
+    def __getitem__(self, index):
+        '''
+        Same behavior as DataStructure.__getitem__ 
+        with the index being relative to the view.
+        '''
+        if isinstance(index, (int, np.integer)):
+            index = [index]
+        if len(index) == 0 : return False
+
+        return self.parent[self._compose(index)]
+
+    def ids(self):
+        '''
+        Returns the ids of the parent objects in the
+        selection as an integer array.
+        '''
+        ids = np.asarray(self.map).ravel()
+        return ids[ids >= 0]
+
+    def get_metadata(self, index):
+        '''
+        Grab the metadata objects of the element at 
+        the index relative to the view.
+        '''
+        return self.parent.get_metadata(self._compose(index))
+
+    def get_metaDataObject(self, address):
+        '''
+        Returns the proper metadata object for a given
+        address
+        '''
+        return self.parent.get_metaDataObject(address)
+
+    def get_slice(self, array):
+        '''
+        Similar to DataStructure.get_slice with the 
+        values relative to the free axes of the view.
+        '''
+        values = []
+        j = 0
+        for value in self._values:
+            if value is None:
+                values.append(array[j] if j < len(array) else '-')
+                j += 1
+            else:
+                values.append(value)
+
+        return self.parent.get_slice(values)
+
+    def returnAsNumpy(self):
+        '''
+        return numpy array of the selection. In dense
+        storage this is a view into the parent buffer.
+        Otherwise the array is assembled from the 
+        selected objects only and then kept until
+        the parent changes.
+        '''
+        index = self.index
+        if not self.parent.buffer is None:
+            return self.parent.buffer[tuple(index)]
+
+        if self._data is None:
+            id_map      = self.map
+            data_dummy  = self.parent.DataObjects[
+                self.parent.get_pos_from_id(self.ids()[0])].data
+            self._data  = np.zeros(
+                id_map.shape + data_dummy.shape, 
+                dtype = data_dummy.dtype)
+            for position in zip(*np.nonzero(id_map >= 0)):
+                self._data[position] = self.parent.DataObjects[
+                    self.parent.get_pos_from_id(id_map[position])].data
+            if not self.cache_key is None:
+                self.parent.slices.resize(
+                    self.cache_key, self.ids().nbytes + self._data.nbytes)
+
+        return self._data
+
+    def bufferAsNumpy(self):
+        '''
+        Same as returnAsNumpy but stored locally.
+        '''
+        self.bufferedData = self.returnAsNumpy()
+
+    def materialize(self):
+        '''
+        Build an independent DataStructure with the 
+        content of the view.
+        '''
+        return self.parent.process_reduction(self.index, self.ids())
+
+    def nbytes(self):
+        '''
+        The memory held by the view itself.
+        '''
+        if self._data is None:
+            return 0
+        return self._data.nbytes
+
+    def _compose(self, index):
+        '''
+        Translate an index relative to the view into
+        an index into the parent.
+        '''
+        composed = []
+        j = 0
+        for i, element in enumerate(self.index):
+            if isinstance(element, int):
+                composed.append(element)
+                continue
+
+            sub = index[j] if j < len(index) else '-'
+            j += 1
+            if isinstance(sub, str) and sub == '-':
+                composed.append(element)
+                continue
+
+            positions = range(self.parent.axes.axes_len[i])[element]
+            if isinstance(sub, slice):
+                positions = positions[sub]
+                composed.append(slice(
+                    positions.start, 
+                    positions.stop if positions.stop >= 0 else None, 
+                    positions.step))
+            else:
+                composed.append(int(positions[int(sub)]))
+
+        return composed
+
 class DataObject:
     '''
     The DataObject class is to be used withe the
@@ -797,6 +1641,86 @@ class DataObject:
                     end_not_reached = False
                     break
 
+class DenseObjects:
+    '''
+    This is the list of DataObjects of a structure
+    that was adopted from an array. The objects 
+    are only created when they are accessed and 
+    are then kept, so that a large array does not
+    have to be split into objects to be used. The
+    ids are the positions in the C order of the 
+    leading axes. Appended objects are simply 
+    stored behind.
+    '''
+    def __init__(self, array, dim, axes = None, linked = False):
+        '''
+        Input: 
+        - array (ndarray or memmap)
+        - dim (int) number of structure axes
+        - axes the axes of the DataObjects
+        - linked (bool) each object is linked to the
+          metadata of the same id
+        '''
+        self.array      = array
+        self.shape      = array.shape[:dim]
+        self.axes       = axes
+        self.linked     = linked
+        self._size      = int(np.prod(self.shape, dtype = 'int64'))
+        self._objects   = {}
+        self._appended  = []
+
+    def __len__(self):
+        return self._size + len(self._appended)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, position):
+        '''
+        Return the object at the position and create
+        it if it does not exist yet.
+        Input: 
+        - position (int or slice)
+        '''
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+
+        position = int(position)
+        if position < 0:
+            position += len(self)
+        if position >= self._size:
+            return self._appended[position - self._size]
+
+        if not position in self._objects:
+            index = np.unravel_index(position, self.shape)
+            index = tuple(int(e) for e in index)
+            self._objects[position] = DataObject(
+                position, self.array[index + (Ellipsis,)], 
+                index, axes = self.axes)
+            if self.linked:
+                self._objects[position].meta_address.append(position)
+
+        return self._objects[position]
+
+    def link(self):
+        '''
+        Link each adopted object to the metadata of 
+        the same id, including the objects that were
+        already created.
+        '''
+        self.linked = True
+        for position, DataObject in self._objects.items():
+            DataObject.meta_address = [position]
+
+    def append(self, DataObject):
+        '''
+        Store an object behind the adopted ones.
+        Input: 
+        - DataObject (DataObject)
+        '''
+        self._appended.append(DataObject)
+
 class Metadata:
     '''
     This class is the one that will store and 
@@ -817,7 +1741,6 @@ class Metadata:
     def __init__(self, meta_id, dictionary = {}):
 
         self.metadata   = dict(dictionary)
-        self.links      = []
         self.meta_id    = int(meta_id)
 
 
@@ -912,7 +1835,7 @@ class Axes:
     - axis values
     - and who populates the axis through ids
     '''
-    def __init__(self, data_structure):
+    def __init__(self, data_structure, id_map = None):
 
         #process dimensionality
         self.dim = len(data_structure.DataObjects[0].index)
@@ -923,9 +1846,13 @@ class Axes:
         self.types       = [None for i in range(self.dim)]
         self.axes        = [[] for i in range(self.dim)]
         self.idx         = [[] for i in range(self.dim)]
+        self.map         = None
 
         #generate axes
-        self.generate(data_structure)
+        if id_map is None:
+            self.generate(data_structure)
+        else:
+            self.generate_from_map(id_map)
 
     def __str__(self):
         '''
@@ -964,6 +1891,24 @@ class Axes:
                 self.idx[i][element.index[i]].append(element.id)
         self.evaluate_length()
 
+    def generate_from_map(self, id_map):
+        '''
+        Fill the ids of the axes directly from an 
+        id map without going through the objects. 
+        This is used by structures adopted from an 
+        array where the map is known in advance.
+        Input: 
+        - id_map (int ndarray) -1 for empty cells
+        '''
+        self.axes_values = [
+            [None for j in range(id_map.shape[i])] 
+            for i in range(self.dim)]
+        self.idx = []
+        for i in range(self.dim):
+            rows = np.moveaxis(id_map, i, 0).reshape(id_map.shape[i], -1)
+            self.idx.append([row[row >= 0].tolist() for row in rows])
+        self.evaluate_length()
+
     def evaluate_length(self):
         '''
         This function will simply evaluate the length
@@ -1006,12 +1951,16 @@ class Axes:
 
     def collapseAllAxes(self, data_structure):
         '''
-
+        Collapse every axis and rebuild the map and 
+        the dense buffer of the structure once at 
+        the end.
         '''
-        for i in range(self.dim):
-            self.collapse_axis(i, data_structure)
+        with data_structure.lock:
+            for i in range(self.dim):
+                self.collapse_axis(i, data_structure, rebuild = False)
+            self.rebuild(data_structure)
 
-    def collapse_axis(self, idx, data_structure):
+    def collapse_axis(self, idx, data_structure, rebuild = True):
         '''
         In this method we will look at an axis and the
         associated values and reduce it. This can be 
@@ -1019,20 +1968,21 @@ class Axes:
         same value...
         Input: 
         - idx index of the axis to evaluate
+        - rebuild (bool) rebuild the map and buffer
         '''
         #create and process new axis
         new_axis = list(sorted(set(self.axes[idx])))
+        lookup   = {value : i for i, value in enumerate(new_axis)}
+        transfer = [lookup[value] for value in self.axes[idx]]
+
+        #merge the ids of the collapsed positions
         new_idx  = [[] for i in range(len(new_axis))]
-        transfer = [
-            new_axis.index(self.axes[idx][i]) 
-            for i in range(len(self.axes[idx]))
-            ]
-            
-        #fix the objects and their axes
-        for i, DataObject in enumerate(data_structure.DataObjects):
-            DataObject.index[idx] = new_axis.index(
-                self.axes[idx][DataObject.index[idx]])
-            new_idx[DataObject.index[idx]].append(DataObject.id)
+        for i, ids in enumerate(self.idx[idx]):
+            new_idx[transfer[i]] += ids
+
+        #fix the objects
+        for DataObject in data_structure.DataObjects:
+            DataObject.index[idx] = transfer[DataObject.index[idx]]
 
         #now inject the new axes into the current  definition
         self.axes[idx] = list(new_axis)
@@ -1040,73 +1990,98 @@ class Axes:
 
         #reevaluate info
         self.evaluate_length()
+        if rebuild:
+            self.rebuild(data_structure)
+
+    def rebuild(self, data_structure):
+        '''
+        The indices of the objects changed, so the 
+        map, the dense buffer and the slices of the
+        structure are built again.
+        '''
+        with data_structure.lock:
+            data_structure.delete_all_slices()
+            data_structure.createMap()
+            data_structure.createBuffer()
 
     def grab_meta(self, idx, key, data_structure):
         '''
         In this function we would like to grab the 
         values of an axis defined in the metadata of
-        the DataObjects. Note that the routine will
-        cycle through the metadata links and over-
-        write itself if multiple definitions are present
+        the DataObjects. The value of each position
+        is read in the metadata column from the first
+        object at that position and is '-' if it is
+        not defined.
         Input: 
         - key of the metadata
         - idx of the axis to be assigned
         '''
-        values = []
-        ids    = []
-        for DataObject in data_structure.DataObjects:
-            value = '-'
-            for address in DataObject.meta_address:
-                try:
-                    value = data_structure.get_metaDataObject(address)[key]
-                except:
-                    pass
-            values.append(value)
-            ids.append(DataObject.index[idx])
-        self.axes[idx] = list(values)
+        table = data_structure.meta_table
+        if not key in table.columns:
+            self.axes[idx] = ['-' for i in range(len(self.idx[idx]))]
+            return
+
+        #the first object at each position of the axis
+        first = np.asarray([
+            data_structure.get_pos_from_id(ids[0]) if len(ids) > 0 else -1
+            for ids in self.idx[idx]], dtype = 'int64')
+        rows = np.where(first >= 0, data_structure.get_meta_rows()[first], -1)
+
+        values, present = table.column(key, rows)
+        self.axes[idx] = [
+            table.value(row, key) if is_present else '-'
+            for row, is_present in zip(rows, present)]
 
     def get_id_for_index(self, index):
         '''
         This method will grab the ID of a single 
         element.
-        it returns a list of the ids that represent
-        the search result
+        it returns an integer array of the ids that 
+        represent the search result. The search is 
+        performed by slicing the id map of the data
+        structure.
         Input: 
         - index (int array)
         '''
-        ids     = []
-        purge   = []
-
-        ##############################################
-        #fill the arrays
-        for idx, element in enumerate(index):
-            if isinstance(element,type(slice(0))) or element == '-':
-                idx_array = self.idx[idx][:]
-                array = []
-                
-                for element_array in idx_array:
-                    for pointer in element_array:
-                        array.append(int(pointer))
-                ids.append(array)
+        selection = []
+        for idx in range(self.dim):
+            element = index[idx] if idx < len(index) else '-'
+            if isinstance(element, slice):
+                selection.append(element)
+            elif isinstance(element, str) and element == '-':
+                selection.append(slice(None))
             else:
-                ids.append(list(self.idx[idx][index[idx]]))
+                selection.append(int(element))
 
-        ##############################################
-        #go through the arrays and take shorterst
-        lengths = [len(array) for array in ids]
-        location = lengths.index(min(lengths))
-
-        for element in ids[location]:
-            for array in ids:
-                if not element in array:
-                    purge.append(element)
-                    break
-        
-        for element in list(set(purge)):
-            if element in ids[location]:
-                ids[location].remove(element)
+        ids = np.asarray(self.map[tuple(selection)]).ravel()
+
+        return ids[ids >= 0]
+
+    def append(self, idx, index):
+        '''
+        Register a new object on the axes. Axes that
+        are too short are extended with positions 
+        as values.
+        Input: 
+        - idx the object id (int)
+        - index (int array)
+        Output: 
+        - True if an axis had to grow
+        '''
+        grown = False
+        for i in range(self.dim):
+            length = len(self.idx[i])
+            if index[i] >= length:
+                self.idx[i] += [[] for j in range(length, index[i] + 1)]
+                self.axes[i] = list(self.axes[i]) + [
+                    j for j in range(length, index[i] + 1)]
+                grown = True
+            self.idx[i][index[i]].append(idx)
+
+        if grown:
+            self.evaluate_length()
 
-        return ids[location]
+        return grown
 
     def get_value(self, axis, idx):
         '''
@@ -1137,12 +2112,13 @@ class Axes:
         This function aims at removing an ID from the 
         axes as it should not longer exist.
         Input:
-        - idx is the axis idx (int)
+        - idx is the object id (int or list)
         '''
+        remove = set(_asIdList(idx))
         for axis in self.idx:
-            for row in axis:
-                if idx in row:
-                    row.remove(idx)
+            for j, row in enumerate(axis):
+                if not remove.isdisjoint(row):
+                    axis[j] = [e for e in row if not e in remove]
 
     def clean_axes(self):
         '''
@@ -1176,3 +2152,74 @@ class Axes:
 
         return self.idx_copy
 
+class AxesView:
+    '''
+    The axes of a DataStructureView. The elements 
+    are read from the axes of the parent on each
+    access so that they follow its changes.
+    '''
+    def __init__(self, view):
+        self._view = view
+
+    def _kept(self):
+        return [
+            i for i, element in enumerate(self._view.index)
+            if not isinstance(element, int)]
+
+    @property
+    def dim(self):
+        return len(self._kept())
+
+    @property
+    def names(self):
+        return [self._view.parent.axes.names[i] for i in self._kept()]
+
+    @property
+    def units(self):
+        return [self._view.parent.axes.units[i] for i in self._kept()]
+
+    @property
+    def types(self):
+        return [self._view.parent.axes.types[i] for i in self._kept()]
+
+    @property
+    def axes(self):
+        return [
+            list(self._view.parent.axes.axes[i][self._view.index[i]])
+            for i in self._kept()]
+
+    @property
+    def axes_len(self):
+        return list(self._view.map.shape)
+
+    @property
+    def map(self):
+        return self._view.map
+
+    def get_position(self, val, idx):
+        '''
+        Position of a value on the axis idx
+        '''
+        return self.axes[idx].index(val)
+
+    def get_value(self, axis, idx):
+        '''
+        Value at the position idx on the axis 
+        '''
+        return self.axes[axis][idx]
+
+    def get_id_for_index(self, index):
+        '''
+        Same as Axes.get_id_for_index on the map of
+        the view.
+        '''
+        return Axes.get_id_for_index(self, index)
+
+def _asIdList(idx):
+    '''
+    Normalise an id or a collection of ids to a 
+    list of python integers.
+    '''
+    if isinstance(idx, (int, np.integer)):
+        return [int(idx)]
+    return [int(e) for e in idx]
@@ -24,6 +24,8 @@
 #import general components
 import numpy as np
 
+from .slice_cache import slice_key
+
 class FitDataInjector:
     '''
     This class is responsible for genrating the adequate numpy 
@@ -33,11 +35,18 @@ class FitDataInjector:
     def __init__(self):
 
         self._data_source       = None
+        self._error_source      = None
+        self._errors            = None
         self._axes_instructions = []
         self._fit_targets       = []
 
         self._behavior_list     = None
+        self._cache             = None
+        self._cache_source      = None
+        self._cache_version     = None
+        self._cache_key         = None
         self._target_dim        = ['x']
+        self.version            = 0
         
     def setDataSource(self, source):
         '''
@@ -45,6 +54,16 @@ class FitDataInjector:
         '''
         self._data_source = source
 
+    def setErrorSource(self, source = None):
+        '''
+        Set the structure holding the error bars of
+        the data. It has the layout of the data 
+        source and is sliced in the same way. None 
+        fits the data without weights.
+        '''
+        self._error_source = source
+        self._prepare_data()
+
     def addFitTarget(self, target):
         '''
         Add a plot target to the list
@@ -90,14 +109,14 @@ class FitDataInjector:
                         shape[self._target_dim.index(behavior[1])] = [
                             j for j in range(
                                 data_dummy.data.shape[
-                                    j - len(self._behavior_list) + 1])]
+                                    i - len(self._behavior_list) + 1])]
                     elif len(data_dummy.data.shape) == 2 and not data_dummy.axes is None:
                         shape[self._target_dim.index(behavior[1])] = data_dummy.axes[i - len(self._behavior_list) + 1]
                     elif len(data_dummy.data.shape) == 2 and data_dummy.axes is None:
                         shape[self._target_dim.index(behavior[1])] = [
                             j for j in range(
                                 data_dummy.data.shape[
-                                    j - len(self._behavior_list) + 1])]
+                                    i - len(self._behavior_list) + 1])]
 
                 index +=1
                 
@@ -125,14 +144,14 @@ class FitDataInjector:
                         shape[self._target_dim.index(behavior[1])] = [
                             j for j in range(
                                 data_dummy.data.shape[
-                                    j - len(self._behavior_list) + 1])]
+                                    i - len(self._behavior_list) + 1])]
                     elif len(data_dummy.data.shape) == 2 and not data_dummy.axes is None:
                         shape[self._target_dim.index(behavior[1])] = data_dummy.axes[i - len(self._behavior_list) + 1]
                     elif len(data_dummy.data.shape) == 2 and data_dummy.axes is None:
                         shape[self._target_dim.index(behavior[1])] = [
                             j for j in range(
                                 data_dummy.data.shape[
-                                    j - len(self._behavior_list) + 1])]
+                                    i - len(self._behavior_list) + 1])]
 
                 index +=1
                 
@@ -147,6 +166,40 @@ class FitDataInjector:
         
         return self._data.__getitem__(tuple([slice(0,len(e)) for e in self.getFitAxes()] + index )) 
 
+    def getErrors(self, index):
+        '''
+        This method will give the error bars at the 
+        given index or None if there are none. 
+        '''
+        if self._errors is None: return None
+        
+        return self._errors.__getitem__(tuple([slice(0,len(e)) for e in self.getFitAxes()] + index )) 
+
+    def _sliceData(self, retrieval_index, order):
+        '''
+        Return the selection of the source with its 
+        axes in the order of the targets. Only the 
+        objects on the selection are read from the 
+        source. The last selection is kept with the 
+        version of the source so that it is only 
+        rebuilt when something changed.
+        Input: 
+        - retrieval_index (int/slice array)
+        - order (int array) as for np.transpose
+        '''
+        key = (slice_key(retrieval_index), tuple(order))
+        if (self._cache is None 
+            or not self._cache_source is self._data_source
+            or not self._cache_version == self._data_source.version
+            or not self._cache_key == key):
+            self._cache         = self._data_source.returnSliceAsNumpy(
+                retrieval_index, order = order)
+            self._cache_source  = self._data_source
+            self._cache_version = self._data_source.version
+            self._cache_key     = key
+
+        return self._cache
+
     def _prepare_data(self):
         '''
         The changes in the data have to be 
@@ -177,25 +230,23 @@ class FitDataInjector:
                         shape[self._target_dim.index(behavior[1])] = [
                             j for j in range(
                                 data_dummy.data.shape[
-                                    j - len(self._behavior_list) + 1])]
+                                    i - len(self._behavior_list) + 1])]
                     elif len(data_dummy.data.shape) == 2 and not data_dummy.axes is None:
                         shape[self._target_dim.index(behavior[1])] = data_dummy.axes[i - len(self._behavior_list) + 1]
                     elif len(data_dummy.data.shape) == 2 and data_dummy.axes is None:
                         shape[self._target_dim.index(behavior[1])] = [
                             j for j in range(
                                 data_dummy.data.shape[
-                                    j - len(self._behavior_list) + 1])]
+                                    i - len(self._behavior_list) + 1])]
 
                 self._axis_index[self._target_dim.index(behavior[1])] = index
                 retrieval_index.append(slice(len(shape[self._target_dim.index(behavior[1])])))
 
                 index +=1
                 
-        data_slice = self._data_source.returnAsNumpy().__getitem__(tuple(retrieval_index))
-        
-        right = ("ijklmnopqrst")[:-(12-len(self._target_dim))]
-        left = "".join([
-            ['i','j','k','l','m','n','o','p','q','r','s','t'][e] 
-            for e in self._axis_index])
-            
-        self._data = np.einsum(right+"->"+left, data_slice)
+        self._data = self._sliceData(retrieval_index, list(self._axis_index))
+        self._errors = None
+        if not self._error_source is None:
+            self._errors = self._error_source.returnSliceAsNumpy(
+                retrieval_index, order = list(self._axis_index))
+        self.version += 1
@@ -0,0 +1,358 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+#############################
+#import general components
+import numpy as np
+
+#the column types of the logical types
+COLUMN_TYPES = {
+    'float' : 'float64',
+    'int'   : 'int64',
+    'bool'  : 'bool'}
+
+class MetadataTable:
+    '''
+    This is the columnar storage of the metadata of
+    the DataObjects. Each key is a typed numpy 
+    column and each metadata object a row. Keys 
+    that a row does not define are masked through
+    the present column of the key. Types that have
+    no numeric representation are stored as str in
+    object columns.
+    '''
+    def __init__(self):
+        self.names      = []
+        self.types      = {}
+        self.units      = {}
+        self.columns    = {}
+        self.present    = {}
+        self.rows       = 0
+        self._capacity  = 0
+
+    def __len__(self):
+        return self.rows
+
+    def __str__(self):
+        '''
+        Generate a string output for the user to
+        see the state of the table.
+        '''
+        output =  "\n##########################################################\n"
+        output += "The metadata table currently consists of:\n"
+        output += "- Number of rows: "+str(self.rows)+"\n"
+        for name in self.names:
+            output += "- "+name+" ("+self.types[name]+", "+str(self.units[name])+")\n"
+        output += "##########################################################\n\n"
+
+        return output
+
+    def add(self, dictionary):
+        '''
+        Add a row from a metadata dictionary in the 
+        format of the Metadata class.
+        Input: 
+        - dictionary {name: [name, type, value, unit]}
+        Output: 
+        - the row (int)
+        '''
+        row = self.rows
+        self._reserve(row + 1)
+        self.rows += 1
+        for name, element in dictionary.items():
+            self.setValue(row, name, element[2], element[1], element[3])
+        return row
+
+    def setValue(self, row, name, value, logical_type = 'str', unit = '-'):
+        '''
+        Set the value of a key in a row. The column is
+        created if the key is new and converted to an
+        object column if the value does not fit.
+        Input: 
+        - row (int)
+        - name (str)
+        - value (str or value)
+        - logical_type (str)
+        - unit (str)
+        '''
+        if not name in self.columns:
+            self._addColumn(name, logical_type, unit)
+
+        try:
+            self.columns[name][row] = self._parse(value, self.types[name])
+        except (TypeError, ValueError):
+            self.columns[name] = self.columns[name].astype(object)
+            self.columns[name][:self.rows][~self.present[name][:self.rows]] = ''
+            self.columns[name][row] = str(value)
+        self.present[name][row] = True
+
+    def setColumn(self, name, values, present, logical_type = 'str', unit = '-'):
+        '''
+        Set a whole column at once. An empty table
+        takes the number of rows of the column. This
+        is how tables are read back from files.
+        Input:
+        - name (str)
+        - values (ndarray) one value per row
+        - present (bool ndarray) one per row
+        - logical_type (str)
+        - unit (str)
+        '''
+        if self.rows == 0:
+            self._reserve(len(values))
+            self.rows = len(values)
+        if not len(values) == self.rows:
+            print("The column does not match the number of rows")
+            return
+
+        values = np.asarray(values)
+        if values.dtype.kind in 'USO':
+            values = values.astype(object)
+        if not name in self.columns:
+            self._addColumn(name, logical_type, unit)
+        if not self.columns[name].dtype == values.dtype:
+            self.columns[name] = self.columns[name].astype(
+                object if values.dtype == object
+                else np.result_type(self.columns[name].dtype, values.dtype))
+        self.columns[name][:self.rows] = values
+        self.present[name][:self.rows] = present
+
+    def value(self, row, name):
+        '''
+        Return the value of a key in a row in its 
+        python type.
+        Input: 
+        - row (int)
+        - name (str)
+        '''
+        value = self.columns[name][row]
+        logical_type = self.types[name]
+        if self.columns[name].dtype == object:
+            if logical_type == 'float_array':
+                return [float(element) for element in value.split('[')[1].split(']')[0].split(',')]
+            elif logical_type == 'int_array':
+                return [int(element) for element in value.split('[')[1].split(']')[0].split(',')]
+            return value
+        return value.item()
+
+    def column(self, name, rows = None):
+        '''
+        Return the values of a column and the mask 
+        of the rows that define it.
+        Input: 
+        - name (str)
+        - rows (int array) optional selection
+        Output: 
+        - values (ndarray)
+        - present (bool ndarray)
+        '''
+        values  = self.columns[name][:self.rows]
+        present = self.present[name][:self.rows]
+        if rows is None:
+            return values, present
+
+        rows    = np.asarray(rows, dtype = 'int64')
+        valid   = rows >= 0
+        if self.rows == 0:
+            return (
+                np.zeros(rows.shape, dtype = values.dtype), 
+                np.zeros(rows.shape, dtype = bool))
+        safe    = np.where(valid, rows, 0)
+        return values[safe], present[safe] & valid
+
+    def numeric(self):
+        '''
+        Return the names of the float and int columns.
+        '''
+        return [
+            name for name in self.names 
+            if self.types[name] in ['float', 'int'] 
+            and not self.columns[name].dtype == object]
+
+    def row(self, row):
+        '''
+        Return a row as a dictionary in the format of
+        the Metadata class.
+        Input: 
+        - row (int)
+        '''
+        output = {}
+        for name in self.names:
+            if self.present[name][row]:
+                output[name] = [
+                    name, self.types[name], 
+                    str(self.columns[name][row]), self.units[name]]
+        return output
+
+    def take(self, rows):
+        '''
+        Return a new table with the selected rows in
+        the given order.
+        Input: 
+        - rows (int array)
+        '''
+        rows = np.asarray(rows, dtype = 'int64')
+        table = MetadataTable()
+        table.names     = list(self.names)
+        table.types     = dict(self.types)
+        table.units     = dict(self.units)
+        table.rows      = rows.size
+        table._capacity = rows.size
+        for name in self.names:
+            table.columns[name] = self.columns[name][rows]
+            table.present[name] = self.present[name][rows]
+        return table
+
+    def average(self, rows, edges, axis = 0, discrete = ()):
+        '''
+        Average groups of rows. The groups are the 
+        consecutive runs of the row array along the 
+        axis starting at the edges, so that a grid of
+        rows can be binned as a whole. The numeric 
+        columns are averaged over the rows that 
+        define them and the other columns are taken 
+        from the first row of each group. Averaged 
+        int columns become float columns unless they
+        are listed as discrete, these are rounded 
+        back to int. Rows set to -1 are ignored. The
+        result is in C order of the reduced grid.
+        Input: 
+        - rows (int ndarray)
+        - edges (int array) start of each group
+        - axis (int) the axis along which to group
+        - discrete (str list) int columns to keep
+        Output: 
+        - the table of the averaged rows
+        '''
+        rows    = np.asarray(rows, dtype = 'int64')
+        edges   = np.asarray(edges, dtype = 'int64')
+
+        first = np.take(rows, edges, axis = axis).ravel()
+        table = self.take(np.where(first >= 0, first, 0))
+        for name in self.names:
+            table.present[name] &= first >= 0
+
+        for name in self.numeric():
+            values, present = self.column(name, rows)
+            summed = np.add.reduceat(
+                np.where(present, values, 0).astype('float64'), edges, axis = axis)
+            number = np.add.reduceat(
+                present.astype('int64'), edges, axis = axis)
+            mean = (summed / np.maximum(number, 1)).ravel()
+            dtype = self.columns[name].dtype
+            if dtype.kind == 'f':
+                table.columns[name] = mean.astype(dtype)
+            elif name in discrete:
+                table.columns[name] = np.rint(mean).astype(dtype)
+            else:
+                table.columns[name] = mean
+                table.types[name]   = 'float'
+            table.present[name] = number.ravel() > 0
+
+        return table
+
+    def extend(self, table):
+        '''
+        Append the rows of another table.
+        Input: 
+        - table (MetadataTable)
+        '''
+        start = self.rows
+        self._reserve(start + table.rows)
+        self.rows += table.rows
+        for name in table.names:
+            if not name in self.columns:
+                self._addColumn(name, table.types[name], table.units[name])
+            if not self.columns[name].dtype == table.columns[name].dtype:
+                if (self.columns[name].dtype == object 
+                    or table.columns[name].dtype == object):
+                    self.columns[name] = self.columns[name].astype(object)
+                else:
+                    self.columns[name] = self.columns[name].astype(np.result_type(
+                        self.columns[name].dtype, table.columns[name].dtype))
+            self.columns[name][start:self.rows] = table.columns[name][:table.rows]
+            self.present[name][start:self.rows] = table.present[name][:table.rows]
+
+    def nbytes(self):
+        '''
+        Return the memory used by the columns.
+        '''
+        return sum(
+            self.columns[name].nbytes + self.present[name].nbytes 
+            for name in self.names)
+
+    def _addColumn(self, name, logical_type, unit):
+        '''
+        Create an empty column for a new key.
+        Input: 
+        - name (str)
+        - logical_type (str)
+        - unit (str)
+        '''
+        self.names.append(name)
+        self.types[name]    = str(logical_type)
+        self.units[name]    = str(unit)
+        self.columns[name]  = np.zeros(
+            self._capacity, dtype = COLUMN_TYPES.get(logical_type, object))
+        if self.columns[name].dtype == object:
+            self.columns[name][:] = ''
+        self.present[name]  = np.zeros(self._capacity, dtype = bool)
+
+    def _reserve(self, rows):
+        '''
+        Grow the columns geometrically so that they
+        can hold the given number of rows.
+        Input: 
+        - rows (int)
+        '''
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, 2 * self._capacity, 16)
+        for name in self.names:
+            column = np.zeros(capacity, dtype = self.columns[name].dtype)
+            if column.dtype == object:
+                column[:] = ''
+            column[:self.rows] = self.columns[name][:self.rows]
+            self.columns[name] = column
+            present = np.zeros(capacity, dtype = bool)
+            present[:self.rows] = self.present[name][:self.rows]
+            self.present[name] = present
+        self._capacity = capacity
+
+    def _parse(self, value, logical_type):
+        '''
+        Convert a value given as string to the type 
+        of the column.
+        Input: 
+        - value (str or value)
+        - logical_type (str)
+        '''
+        if logical_type == 'float':
+            return float(value)
+        elif logical_type == 'int':
+            return int(float(value))
+        elif logical_type == 'bool':
+            if isinstance(value, str):
+                return not value.strip().lower() in ['false', '0', '']
+            return bool(value)
+        return str(value)
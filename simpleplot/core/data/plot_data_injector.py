@@ -25,6 +25,10 @@
 #import general components
 import numpy as np
 
+from .slice_cache import slice_key
+from .update_scheduler import UpdateScheduler
+from .slice_prefetcher import SlicePrefetcher, neighbours
+
 class PlotDataInjector:
     '''
     This class is responsible for genrating the adequate numpy 
@@ -39,12 +43,23 @@ class PlotDataInjector:
 
         self._behavior_list     = None
         self._target_dim        = None
+        self._last_fixed        = None
+        self._neighbours        = []
+        self._prefetcher        = SlicePrefetcher(self._fetchSlice)
+        self._scheduler         = UpdateScheduler(
+            self._computeData, self._deliverData)
         
     def setDataSource(self, source):
         '''
         replace the source of the data
         '''
+        if not self._data_source is None:
+            self._data_source.removeListener(self.dataRegionChanged)
         self._data_source = source
+        self._last_fixed = None
+        self._prefetcher.clear()
+        if not self._data_source is None:
+            self._data_source.addListener(self.dataRegionChanged)
 
     def addPlotTarget(self, target):
         '''
@@ -69,6 +84,96 @@ class PlotDataInjector:
         self._target_dim = target_dim
         self.dataChanged()
     
+    def dataRegionChanged(self, region):
+        '''
+        This is the listener of the data source. The 
+        region is the index of the element that 
+        changed or None if everything changed. If the
+        element is not on one of the displayed fixed
+        indices nothing has to be done.
+        '''
+        if region is None or self._behavior_list is None: 
+            self.dataChanged()
+            return
+
+        for i, behavior in enumerate(self._behavior_list[:len(region)]):
+            if behavior[1] == "Fixed" and not behavior[2] == region[i]:
+                return
+
+        self.dataChanged()
+
+    def _sliceData(self, source, retrieval_index, order, cancelled = None):
+        '''
+        Return the selection of the source with its 
+        axes in the order of the targets. Only the 
+        objects on the selection are read from the 
+        source. The selections are kept with the 
+        version of the source in the prefetcher so 
+        that stepping back and forth through a fixed
+        index does not rebuild them.
+        Input: 
+        - source (DataStructure)
+        - retrieval_index (int/slice array)
+        - order (int array) as for np.transpose
+        - cancelled (method) stops the retrieval
+        '''
+        return self._prefetcher.get(
+            self._sliceKey(source, retrieval_index, order),
+            source, retrieval_index, order, cancelled = cancelled)
+
+    def _sliceKey(self, source, retrieval_index, order):
+        '''
+        The key of a selection in the prefetcher.
+        '''
+        return (
+            id(source), source.version, 
+            slice_key(retrieval_index), tuple(order))
+
+    def _fetchSlice(self, source, retrieval_index, order, cancelled = None):
+        '''
+        Read a selection from the source. This is the
+        compute method of the prefetcher.
+        '''
+        return source.returnSliceAsNumpy(
+            retrieval_index, order = order, cancelled = cancelled)
+
+    def _findNeighbours(self, retrieval_index, order):
+        '''
+        If a single fixed index was stepped since the 
+        last update the selections around the new 
+        position along that axis are prepared for the
+        prefetcher. They are only computed once the 
+        current selection was delivered.
+        Input: 
+        - retrieval_index (int/slice array)
+        - order (int array) as for np.transpose
+        '''
+        fixed = [
+            (i, element) for i, element in enumerate(retrieval_index)
+            if not isinstance(element, slice)]
+        last_fixed, self._last_fixed = self._last_fixed, fixed
+        self._neighbours = []
+        if last_fixed is None or not len(last_fixed) == len(fixed):
+            return
+
+        stepped = [
+            (new, old) for new, old in zip(fixed, last_fixed) 
+            if not new == old]
+        if not len(stepped) == 1: return
+        (axis, position), (old_axis, previous) = stepped[0]
+        if not axis == old_axis or axis >= self._data_source.axes.dim:
+            return
+
+        for element in neighbours(
+                position, previous, 
+                self._data_source.axes.axes_len[axis], 
+                self._prefetcher.depth):
+            local_index = list(retrieval_index)
+            local_index[axis] = element
+            self._neighbours.append([
+                self._sliceKey(self._data_source, local_index, order),
+                (self._data_source, local_index, order)])
+
     def dataChanged(self):
         '''
         The changes in the data have to be 
@@ -99,37 +204,53 @@ class PlotDataInjector:
                         shape[self._target_dim.index(behavior[1])] = [
                             j for j in range(
                                 data_dummy.data.shape[
-                                    j - len(self._behavior_list) + 1])]
+                                    i - len(self._behavior_list) + 1])]
                     elif len(data_dummy.data.shape) == 2 and not data_dummy.axes is None:
                         shape[self._target_dim.index(behavior[1])] = data_dummy.axes[i - len(self._behavior_list) + 1]
                     elif len(data_dummy.data.shape) == 2 and data_dummy.axes is None:
                         shape[self._target_dim.index(behavior[1])] = [
                             j for j in range(
                                 data_dummy.data.shape[
-                                    j - len(self._behavior_list) + 1])]
+                                    i - len(self._behavior_list) + 1])]
 
                 axis_index[self._target_dim.index(behavior[1])] = index
                 retrieval_index.append(slice(len(shape[self._target_dim.index(behavior[1])])))
 
                 index +=1
 
-        data_slice = self._data_source.returnAsNumpy().__getitem__(
-            tuple(retrieval_index))
+        order = [int(e) for e in np.argsort(axis_index)]
+        self._findNeighbours(retrieval_index, order)
+        self._scheduler.request(
+            self._data_source, retrieval_index, 
+            order, shape, list(self._target_dim))
 
-        right = ("->" + "ijklmnopqrst")[:-(12-len(self._target_dim))]
-        left = "".join([
-            ['i','j','k','l','m','n','o','p','q','r','s','t'][e] 
-            for e in axis_index])
-        data = np.einsum(left+right, data_slice)
+    def _computeData(self, cancelled, source, retrieval_index, order, shape, target_dim):
+        '''
+        Build the keywords sent to the plot targets. 
+        This runs in the worker thread of the update
+        scheduler and returns None if it was 
+        superseded by a newer request.
+        '''
+        data = self._sliceData(source, retrieval_index, order, cancelled)
+        if data is None or cancelled(): return None
 
         keywords = ['x','y','z','data']
         data_dict = {}
         for key in keywords:
-            if key in self._target_dim:
-                data_dict[key] = shape[self._target_dim.index(key)]
+            if key in target_dim:
+                data_dict[key] = shape[target_dim.index(key)]
             else:
                 data_dict[key] = data
                 break
 
+        return data_dict
+
+    def _deliverData(self, data_dict):
+        '''
+        Send the data to the plot targets. This runs
+        on the GUI thread. The neighbours of the 
+        selection are prefetched afterwards.
+        '''
         for plot_target in self._plot_targets:
             plot_target.setData(**data_dict)
+        self._prefetcher.prefetch(self._neighbours)
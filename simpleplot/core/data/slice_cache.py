@@ -0,0 +1,210 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+#############################
+#import general components
+from collections import OrderedDict
+import numpy as np
+
+class SliceCache:
+    '''
+    This is the cache of the reduced structures of
+    a DataStructure. It is a least recently used
+    cache bounded by a memory budget in bytes. Each
+    entry remembers the ids of the objects it was
+    built from so that removing objects only drops
+    the entries that contained them.
+    '''
+    def __init__(self, max_bytes = 256 * 1024**2):
+        '''
+        Input:
+        - max_bytes (int) the memory budget
+        '''
+        self.max_bytes      = int(max_bytes)
+        self.current_bytes  = 0
+        self.hits           = 0
+        self.misses         = 0
+        self.evictions      = 0
+        self._entries       = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __str__(self):
+        '''
+        Generate a string output for the user to
+        see the state of the cache.
+        '''
+        output =  "\n##########################################################\n"
+        output += "The slice cache currently consists of:\n"
+        output += "- Number of entries: "+str(len(self._entries))+"\n"
+        output += "- Memory used: "+str(self.current_bytes)+" / "+str(self.max_bytes)+" bytes\n"
+        output += "- Hits: "+str(self.hits)+"\n"
+        output += "- Misses: "+str(self.misses)+"\n"
+        output += "- Evictions: "+str(self.evictions)+"\n"
+        output += "##########################################################\n\n"
+
+        return output
+
+    def get(self, key):
+        '''
+        Return the cached element and mark it as the
+        most recently used or None if absent.
+        Input:
+        - key (tuple)
+        '''
+        if not key in self._entries:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def add(self, key, item, ids = None, size = 0):
+        '''
+        Add an element to the cache and evict the
+        least recently used ones until the budget is
+        respected. Elements larger than the budget
+        are not stored.
+        Input:
+        - key (tuple)
+        - item (the cached element)
+        - ids (int array) ids of the source objects
+        - size (int) the memory footprint in bytes
+        '''
+        self.remove(key)
+        if size > self.max_bytes:
+            self.evictions += 1
+            return
+
+        if not ids is None:
+            ids = np.asarray(ids, dtype = 'int64')
+        self._entries[key] = [item, ids, int(size)]
+        self.current_bytes += int(size)
+        self._evict()
+
+    def resize(self, key, size):
+        '''
+        Update the memory footprint of an element that
+        grew after it was added and evict if needed. 
+        An element larger than the budget is dropped.
+        Input:
+        - key (tuple)
+        - size (int) the memory footprint in bytes
+        '''
+        if not key in self._entries:
+            return
+        self.current_bytes += int(size) - self._entries[key][2]
+        self._entries[key][2] = int(size)
+        if size > self.max_bytes:
+            self.remove(key)
+            self.evictions += 1
+            return
+        self._evict()
+
+    def remove(self, key):
+        '''
+        Remove an element from the cache if present.
+        Input:
+        - key (tuple)
+        '''
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[2]
+
+    def invalidate(self, ids):
+        '''
+        Drop the entries that were built from any of
+        the given object ids. Entries without known
+        ids are dropped as well.
+        Input:
+        - ids (int array)
+        '''
+        ids = np.asarray(ids, dtype = 'int64')
+        if ids.size == 0: return
+
+        purge = [
+            key for key, entry in self._entries.items()
+            if entry[1] is None or np.isin(entry[1], ids).any()]
+        for key in purge:
+            self.remove(key)
+
+    def invalidate_point(self, key):
+        '''
+        Drop the entries whose selection contains the
+        point described by the key of axis values. 
+        This is used when an object was added.
+        Input:
+        - key (tuple) one value per axis
+        '''
+        purge = [
+            entry_key for entry_key in self._entries.keys()
+            if all(
+                element == '-' or element == value 
+                for element, value in zip(entry_key, key))]
+        for entry_key in purge:
+            self.remove(entry_key)
+
+    def clear(self):
+        '''
+        Empty the cache while keeping the counters.
+        '''
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def setBudget(self, max_bytes):
+        '''
+        Change the memory budget and evict if needed.
+        Input:
+        - max_bytes (int)
+        '''
+        self.max_bytes = int(max_bytes)
+        self._evict()
+
+    def _evict(self):
+        '''
+        Remove least recently used entries until the
+        memory budget is met.
+        '''
+        while self.current_bytes > self.max_bytes and len(self._entries) > 0:
+            self.current_bytes -= self._entries.popitem(last = False)[1][2]
+            self.evictions += 1
+
+def slice_key(values):
+    '''
+    Normalise the value array given to get_slice
+    to a hashable key. Numpy scalars are converted
+    to python scalars and lists to tuples.
+    Input:
+    - values (list)
+    '''
+    if isinstance(values, (list, tuple, np.ndarray)):
+        return tuple(slice_key(element) for element in values)
+    elif isinstance(values, slice):
+        return ('slice', values.start, values.stop, values.step)
+    elif isinstance(values, np.generic):
+        return values.item()
+    return values
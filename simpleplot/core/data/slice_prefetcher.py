@@ -0,0 +1,143 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+#############################
+#import general components
+import threading
+import numpy as np
+
+from .slice_cache import SliceCache
+
+class SlicePrefetcher:
+    '''
+    This class keeps the slices that were computed
+    in a byte budgeted cache and computes the ones
+    that are likely to be asked next in a 
+    background thread. A new prefetch supersedes 
+    the one in flight so that only the neighbours
+    of the latest position are computed.
+    '''
+    def __init__(self, compute, depth = 2, max_bytes = 64 * 1024**2):
+        '''
+        Input: 
+        - compute (method) called as compute(*args, 
+          cancelled = method) and returning an array
+          or None if it was cancelled
+        - depth (int) number of neighbours on each 
+          side that are prefetched
+        - max_bytes (int) the memory budget
+        '''
+        self.depth          = int(depth)
+        self.cache          = SliceCache(max_bytes)
+        self._compute       = compute
+        self._lock          = threading.Lock()
+        self._generation    = 0
+
+    def get(self, key, *args, cancelled = None):
+        '''
+        Return the slice of the key, computing it now
+        if it was not prefetched.
+        Input: 
+        - key (hashable)
+        - args passed on to compute
+        - cancelled (method) passed on to compute
+        '''
+        with self._lock:
+            item = self.cache.get(key)
+        if not item is None:
+            return item
+
+        item = self._compute(*args, cancelled = cancelled)
+        if not item is None:
+            self._store(key, item)
+        return item
+
+    def prefetch(self, requests):
+        '''
+        Compute the requests that are not cached yet
+        in a background thread, in the given order.
+        Input: 
+        - requests (list) of [key, args] 
+        '''
+        self._generation += 1
+        with self._lock:
+            requests = [
+                request for request in requests 
+                if not request[0] in self.cache]
+        if len(requests) == 0:
+            return
+
+        thread = threading.Thread(
+            target = self._run, args = (self._generation, requests))
+        thread.daemon = True
+        thread.start()
+
+    def clear(self):
+        '''
+        Drop the cached slices and stop the prefetch
+        in flight.
+        '''
+        self._generation += 1
+        with self._lock:
+            self.cache.clear()
+
+    def _run(self, generation, requests):
+        '''
+        The body of the prefetch thread.
+        '''
+        cancelled = lambda: not generation == self._generation
+        for key, args in requests:
+            if cancelled():
+                return
+            try:
+                item = self._compute(*args, cancelled = cancelled)
+            except Exception:
+                return
+            if not item is None and not cancelled():
+                self._store(key, item)
+
+    def _store(self, key, item):
+        '''
+        Add a slice to the cache.
+        '''
+        with self._lock:
+            self.cache.add(key, item, size = np.asarray(item).nbytes)
+
+def neighbours(position, previous, length, depth):
+    '''
+    Return the positions around the current one along
+    an axis, the direction of the last step first.
+    Input: 
+    - position (int) the current position
+    - previous (int) the position before the step
+    - length (int) the length of the axis
+    - depth (int) the number of neighbours per side
+    '''
+    direction = -1 if previous > position else 1
+    output = []
+    for distance in range(1, depth + 1):
+        for sign in [direction, -direction]:
+            element = position + sign * distance
+            if 0 <= element < length:
+                output.append(element)
+    return output
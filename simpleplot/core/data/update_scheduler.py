@@ -0,0 +1,168 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+#############################
+#import general components
+from PyQt5 import QtCore
+import threading
+
+class UpdateScheduler(QtCore.QObject):
+    '''
+    This class coalesces bursts of update requests
+    and runs the computation in a worker thread. 
+    The timer is started by the first request and 
+    not restarted by the following ones, so the 
+    requests made within one interval result in a
+    single computation and a steady stream of 
+    requests is computed once per interval. The 
+    result is delivered on the GUI thread. A 
+    request made while a computation runs 
+    supersedes it: the old result is dropped and 
+    the computation can poll the cancelled method 
+    it is given to stop early. Results are never 
+    dropped twice in a row though, otherwise a 
+    stream of requests faster than the 
+    computation would never be shown.
+
+    Without a running Qt application the requests 
+    are processed synchronously.
+    '''
+    finished = QtCore.pyqtSignal(int, object)
+
+    def __init__(self, compute, deliver, interval = 16):
+        '''
+        Input: 
+        - compute (method) called in the worker as
+          compute(cancelled, *args) and returning 
+          the result or None
+        - deliver (method) called on the GUI thread
+          with the result
+        - interval (int) coalescing window in ms
+        '''
+        QtCore.QObject.__init__(self)
+        self._compute       = compute
+        self._deliver       = deliver
+        self._generation    = 0
+        self._cancelled     = 0
+        self._dropped       = False
+        self._arguments     = ()
+        self._running       = False
+        self._pending       = False
+        self.synchronous    = False
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(int(interval))
+        self._timer.timeout.connect(self._start)
+        self.finished.connect(self._finish)
+
+    def request(self, *args):
+        '''
+        Ask for an update with the given arguments. 
+        Only the arguments of the last request in the
+        interval are used.
+        '''
+        self._generation += 1
+        self._arguments = args
+        self._pending   = True
+
+        if self.synchronous or QtCore.QCoreApplication.instance() is None:
+            self._pending = False
+            result = self._compute(lambda: False, *args)
+            if not result is None:
+                self._deliver(result)
+            return
+
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def cancel(self):
+        '''
+        Drop the pending request and the result of 
+        the running computation.
+        '''
+        self._generation += 1
+        self._cancelled = self._generation
+        self._pending = False
+        self._timer.stop()
+
+    def isRunning(self):
+        '''
+        Return whether a computation is in flight.
+        '''
+        return self._running
+
+    def _start(self):
+        '''
+        Start the computation of the last request in 
+        a worker thread. If one is already running the
+        start is postponed until it is done.
+        '''
+        if self._running or not self._pending:
+            return
+        self._running = True
+        self._pending = False
+        generation = self._generation
+        thread = threading.Thread(
+            target = self._run, 
+            args = (generation, self._arguments, self._dropped))
+        thread.daemon = True
+        thread.start()
+
+    def _run(self, generation, args, keep):
+        '''
+        The body of the worker thread. The result of
+        a superseded request is dropped before it is
+        sent to the GUI thread, unless the previous 
+        result was dropped already. Cancelled results
+        are always dropped.
+        Input: 
+        - generation (int) of the request
+        - args the arguments of the request
+        - keep (bool) the previous result was dropped
+        '''
+        def cancelled():
+            if generation <= self._cancelled:
+                return True
+            return not keep and not generation == self._generation
+
+        try:
+            result = self._compute(cancelled, *args)
+        except Exception as error:
+            print("The update could not be computed: " + str(error))
+            result = None
+        self._dropped = cancelled()
+        if self._dropped:
+            result = None
+        self.finished.emit(generation, result)
+
+    def _finish(self, generation, result):
+        '''
+        Deliver the result on the GUI thread and 
+        compute the latest request if there is one.
+        '''
+        self._running = False
+        if not result is None:
+            self._deliver(result)
+        if self._pending and not self._timer.isActive():
+            self._start()
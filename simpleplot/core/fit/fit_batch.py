@@ -0,0 +1,214 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by Alexander Schober 
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal
+
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import os
+import numpy as np
+
+from .fit_worker import FitWorker
+
+#the fit worker of a pool process
+_process_worker = None
+
+def init_process(definitions, x, parameters, mode, loss, f_scale):
+    '''
+    The initializer of the processes of the pool. 
+    The function definitions and the axes are sent 
+    once per process and the fit worker of the 
+    process is built from them.
+    Input: 
+    - definitions ([key, function]) the functions 
+      of a ray in the order of the dictionary
+    - x the fit axes
+    - parameters ([order, repetition])
+    - mode (str) the fit mode
+    - loss (str) and f_scale (float) the loss
+    '''
+    global _process_worker
+    _process_worker = FitWorker()
+    _process_worker.setXY(x, [])
+    _process_worker.setParameters(*parameters)
+    _process_worker.setMode(mode)
+    _process_worker.setLoss(loss, f_scale)
+    for key, source in definitions:
+        _process_worker.addFunction(key, source = source)
+    _process_worker.fitter.functions = _process_worker.func_dict
+
+def fit_rays(tasks):
+    '''
+    Fit a chunk of rays with the fit worker of the
+    process. Rays whose fit fails are returned 
+    without parameters.
+    Input: 
+    - tasks ([idx, y, errors, paras]) with the 
+      error bars of y or None and the starting 
+      parameters as one list per function
+    Output: 
+    - [idx, paras, para_err] per ray
+    '''
+    worker = _process_worker
+    elements = [
+        element for key in worker.func_dict.keys()
+        for element in worker.func_dict[key][2]]
+
+    output = []
+    for idx, y, errors, paras in tasks:
+        worker.fitter.y = np.asarray(y)
+        worker.fitter.setErrors(errors)
+        for element, values in zip(elements, paras):
+            element.paras       = list(values)
+            element.para_err    = [0. for e in values]
+            element.calculated  = False
+        try:
+            worker.fitter.fit()
+        except (ValueError, np.linalg.LinAlgError) as error:
+            print("The fit of ray " + str(idx) + " failed: " + str(error))
+            output.append([idx, None, None])
+            continue
+        output.append([
+            idx, 
+            [list(element.paras) for element in elements],
+            [list(element.para_err) for element in elements]])
+
+    return output
+
+class BatchFitter(QtCore.QObject):
+    '''
+    The batch fitter fits every ray of the data
+    independently across a pool of processes. It
+    lives in its own QThread and streams the 
+    results back chunk by chunk through the result
+    signal. Only a few chunks are in flight at a 
+    time so that the data of the rays is read as 
+    the fit advances.
+    '''
+    progress_int    = pyqtSignal(int)
+    progress_str    = pyqtSignal(str)
+    result          = pyqtSignal(object)
+    finished        = pyqtSignal()
+
+    def __init__(self):
+        QtCore.QObject.__init__(self)
+        self.workers    = None
+        self.chunk      = 8
+        self._job       = None
+        self._cancelled = False
+
+    def setJob(self, definitions, x, parameters, mode, loss, f_scale, 
+               rays, task, workers = None):
+        '''
+        Set up the next batch.
+        Input: 
+        - definitions, x, parameters, mode, loss and 
+          f_scale as for init_process
+        - rays (int) the number of rays
+        - task (method) returning [idx, y, errors, 
+          paras] of a ray index
+        - workers (int) the number of processes, 
+          one per cpu if None
+        '''
+        self._job = [
+            [definitions, x, parameters, mode, loss, f_scale], 
+            rays, task]
+        self.workers = workers
+
+    def cancel(self):
+        '''
+        Stop the batch after the chunks that are 
+        currently running.
+        '''
+        self._cancelled = True
+
+    @QtCore.pyqtSlot()
+    def run(self):
+        '''
+        Fit all the rays of the job. With a single
+        worker the rays are fitted in this thread.
+        '''
+        self._cancelled = False
+        initargs, rays, task = self._job
+        chunks = [
+            range(start, min(start + self.chunk, rays)) 
+            for start in range(0, rays, self.chunk)]
+        workers = self.workers or os.cpu_count() or 1
+        self._done = 0
+        self._rays = rays
+
+        self.progress_str.emit('Fitting ' + str(rays) + ' rays')
+        self.progress_int.emit(0)
+        if workers == 1 or len(chunks) == 1:
+            init_process(*initargs)
+            for chunk in chunks:
+                if self._cancelled: 
+                    break
+                self._report(fit_rays([task(idx) for idx in chunk]))
+        else:
+            self._runPool(chunks, task, initargs, workers)
+
+        if self._cancelled:
+            self.progress_str.emit('Batch fit cancelled')
+        self.finished.emit()
+
+    def _runPool(self, chunks, task, initargs, workers):
+        '''
+        Distribute the chunks over the process pool 
+        keeping twice as many chunks in flight as 
+        there are processes.
+        '''
+        queue = iter(chunks)
+        pending = set()
+        with ProcessPoolExecutor(
+                max_workers = workers, initializer = init_process, 
+                initargs = tuple(initargs)) as executor:
+            while True:
+                while not self._cancelled and len(pending) < 2 * workers:
+                    chunk = next(queue, None)
+                    if chunk is None: 
+                        break
+                    pending.add(executor.submit(
+                        fit_rays, [task(idx) for idx in chunk]))
+
+                if len(pending) == 0 or self._cancelled: 
+                    break
+
+                done, pending = wait(pending, return_when = FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        self._report(future.result())
+                    except Exception as error:
+                        print("A batch of rays could not be fitted: " + str(error))
+
+            if self._cancelled:
+                executor.shutdown(wait = True, cancel_futures = True)
+
+    def _report(self, output):
+        '''
+        Send the results of a chunk and the progress.
+        '''
+        self._done += len(output)
+        self.result.emit(output)
+        self.progress_int.emit(int(100 * self._done / max(self._rays, 1)))
@@ -23,7 +23,9 @@
 
 
 from .fit_worker import FitWorker
+from .fit_batch import BatchFitter
 from .function_library import FunctionLibrary
+from ..data.slice_prefetcher import SlicePrefetcher, neighbours
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 import sys
@@ -48,7 +50,13 @@ class FitHandler(QtCore.QObject, FunctionLibrary):
 
         self._data_link = data_link
         self._max_rays = self._data_link.getVariableAxes()
+        self._prefetcher = SlicePrefetcher(self._fetchRay)
         self.current_idx = 0
+        self.fit_mode = 'sequential'
+        self.fit_loss = 'linear'
+        self.fit_parameters = [[0,1,2,3],10]
+        self.batch_workers = None
+        self.covariance = None
 
         if not gui:
             self.openDummyApp()
@@ -80,6 +88,15 @@ class FitHandler(QtCore.QObject, FunctionLibrary):
         self.fit_worker.finished.connect(self.finishedFit)
         self.fit_worker.fitter.progress_int.connect(self.reportProgressInt)
         self.fit_worker.fitter.progress_str.connect(self.reportProgressStr)
+
+        self.batch_thread = QtCore.QThread()
+        self.batch_fitter = BatchFitter()
+        self.batch_fitter.moveToThread(self.batch_thread)
+        self.batch_thread.started.connect(self.batch_fitter.run)
+        self.batch_fitter.result.connect(self.receiveBatchResult)
+        self.batch_fitter.finished.connect(self.finishedBatchFit)
+        self.batch_fitter.progress_int.connect(self.reportProgressInt)
+        self.batch_fitter.progress_str.connect(self.reportProgressStr)
         
         self.importFunctions()
         self.current_ray = [
@@ -101,6 +118,35 @@ class FitHandler(QtCore.QObject, FunctionLibrary):
         self.prepareFit()
         self.fit_thread.start()
 
+    def performBatchFit(self):
+        '''
+        Fit every ray independently in a pool of 
+        processes. The results are written into the
+        functions of each ray as they arrive.
+        '''
+        if self.batch_thread.isRunning():
+            return
+        self.prepareBatchFit()
+        self.batch_thread.start()
+
+    def setFitMode(self, mode):
+        '''
+        Select the fit engine, 'sequential' fits one 
+        parameter at a time and 'joint' all the free 
+        parameters at once.
+        '''
+        if not mode in ['sequential', 'joint']:
+            print("The fit mode has to be 'sequential' or 'joint'")
+            return
+        self.fit_mode = mode
+
+    def cancelBatchFit(self):
+        '''
+        Stop a running batch fit. The rays fitted so
+        far keep their results.
+        '''
+        self.batch_fitter.cancel()
+
     def reportProgressInt(self, percentage):
         '''
         propagate the signals for the gui
@@ -130,9 +176,72 @@ class FitHandler(QtCore.QObject, FunctionLibrary):
         '''
         self.fit_worker.setXY(
             self._data_link.getFitAxes(),
-            self._data_link.getData(self.current_ray))
+            self._data_link.getData(self.current_ray),
+            errors = self._fetchErrors(self.current_ray))
         self.cloneToWorker()
-        self.fit_worker.setParameters([0,1,2,3],1e10,10)
+        self.fit_worker.setParameters(*self.fit_parameters)
+        self.fit_worker.setMode(self.fit_mode)
+        self.fit_worker.setLoss(self.fit_loss)
+
+    def prepareBatchFit(self):
+        '''
+        Set up the batch fitter. The functions of the
+        current ray define the model and its bounds 
+        and are sent once to each process, the 
+        starting parameters are those of each ray.
+        '''
+        definitions = [
+            [key, element[self.current_idx]] 
+            for key in self.func_dict.keys()
+            for element in self.func_dict[key][2]]
+
+        self.batch_fitter.setJob(
+            definitions, self._data_link.getFitAxes(),
+            self.fit_parameters, self.fit_mode, self.fit_loss, 1.,
+            self.rayCount(), self._batchTask, 
+            workers = self.batch_workers)
+
+    def _batchTask(self, idx):
+        '''
+        The task of a ray for the batch fitter. It is 
+        called from the thread of the batch fitter.
+        Input: 
+        - idx (int) the index of the ray
+        Output: 
+        - [idx, y, errors, paras]
+        '''
+        ray = self.getRay(idx)
+        return [
+            idx, self._fetchRay(ray), self._fetchErrors(ray),
+            [list(element[idx].paras)
+            for key in self.func_dict.keys()
+            for element in self.func_dict[key][2]]]
+
+    def receiveBatchResult(self, output):
+        '''
+        Write the results of a chunk of the batch fit 
+        into the functions of the rays.
+        Input: 
+        - output ([idx, paras, para_err]) per ray
+        '''
+        elements = [
+            element for key in self.func_dict.keys()
+            for element in self.func_dict[key][2]]
+
+        for idx, paras, para_err in output:
+            if paras is None: 
+                continue
+            for element, values, errors in zip(elements, paras, para_err):
+                element[idx].paras       = list(values)
+                element[idx].para_err    = list(errors)
+                element[idx].calculated  = False
+
+    def finishedBatchFit(self):
+        '''
+        The batch fit is done or was cancelled.
+        '''
+        self.batch_thread.quit()
+        self.progress_finished.emit()
 
     def cloneToWorker(self):
         '''
@@ -157,6 +266,7 @@ class FitHandler(QtCore.QObject, FunctionLibrary):
             for i, element in enumerate(self.func_dict[key][2]):
                 element[self.current_idx].clone(
                     self.fit_worker.func_dict[key][2][i])
+        self.covariance = self.fit_worker.fitter.covariance
 
         self.progress_finished.emit()
                 
@@ -164,19 +274,93 @@ class FitHandler(QtCore.QObject, FunctionLibrary):
         '''
         Allow external interface to set the ray
         '''
+        previous = self.current_ray
         self.current_ray = list(ray)
         self.current_idx = self.getCurrentIdx()
+        self._prefetchRays(previous)
+
+    def _prefetchRays(self, previous):
+        '''
+        If a single index of the ray was stepped the
+        rays around it along that axis are prepared
+        in the background.
+        Input: 
+        - previous (int array) the ray before the step
+        '''
+        stepped = [
+            i for i, (new, old) in enumerate(zip(self.current_ray, previous))
+            if not new == old]
+        if not len(stepped) == 1 or not len(previous) == len(self.current_ray): 
+            return
+
+        axis = stepped[0]
+        requests = []
+        for element in neighbours(
+                self.current_ray[axis], previous[axis], 
+                len(self._max_rays[axis]), self._prefetcher.depth):
+            ray = list(self.current_ray)
+            ray[axis] = element
+            requests.append([self._rayKey(ray), (ray,)])
+        self._prefetcher.prefetch(requests)
+
+    def _rayKey(self, ray):
+        '''
+        The key of a ray in the prefetcher.
+        '''
+        return (self._data_link.version, tuple(ray))
+
+    def _fetchRay(self, ray, cancelled = None):
+        '''
+        Read the data of a ray from the link. This is 
+        the compute method of the prefetcher.
+        '''
+        return np.array(self._data_link.getData(list(ray)))
+
+    def _fetchErrors(self, ray):
+        '''
+        Read the error bars of a ray from the link, 
+        None if the data has none.
+        '''
+        errors = self._data_link.getErrors(list(ray))
+        return None if errors is None else np.array(errors)
 
     def getCurrentIdx(self):
         '''
         Get the current idx for the function library
         '''
-        return int(np.sum(
-            np.array(self.current_ray)
-            *np.array([1.]+[
-                np.prod(self._max_rays[0:i])
-                for i in range(1, len(self.current_ray)-1)
-            ])))
+        return self.getRayIdx(self.current_ray)
+
+    def getRayIdx(self, ray):
+        '''
+        The index of a ray in the function lists. The
+        first index of the ray runs fastest.
+        '''
+        if len(ray) == 0:
+            return 0
+        return int(np.ravel_multi_index(
+            tuple(ray), self._rayShape(), order = 'F'))
+
+    def getRay(self, idx):
+        '''
+        The ray of an index of the function lists.
+        '''
+        if len(self._max_rays) == 0:
+            return []
+        return [
+            int(e) for e in np.unravel_index(
+                idx, self._rayShape(), order = 'F')]
+
+    def rayCount(self):
+        '''
+        The number of rays of the data.
+        '''
+        return int(np.prod(self._rayShape()))
+
+    def _rayShape(self):
+        '''
+        The number of values of each variable axis.
+        '''
+        return tuple(len(axis) for axis in self._max_rays)
 
     def getFunctionX(self):
         '''
@@ -197,7 +381,8 @@ class FitHandler(QtCore.QObject, FunctionLibrary):
         '''
         Get the current idx for the function library
         '''
-        return np.array(self._data_link.getData(self.current_ray))
+        return self._prefetcher.get(
+            self._rayKey(self.current_ray), self.current_ray)
 
     def getFitSumY(self):
         '''
@@ -209,4 +394,4 @@ class FitHandler(QtCore.QObject, FunctionLibrary):
             for i, element in enumerate(self.func_dict[key][2]):
                 output += element[self.current_idx].returnData(x)
         return output
-        
\ No newline at end of file
+        
\ No newline at end of file
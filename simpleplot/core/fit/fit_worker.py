@@ -67,22 +67,48 @@ class FitWorker(QtCore.QObject, FunctionLibrary):
         self.importFunctions()
         self.fitter = Fitter()
 
-    def setXY(self, x, y):
+    def setXY(self, x, y, errors = None):
         '''
         This function will do all the loading of the 
         different functions locally in the class
+        Input: 
+        - x, y the data
+        - errors the error bars of y, the points are
+          then weighted by their inverse
         '''
         self.fitter.x = np.asarray(x)
         self.fitter.y = np.asarray(y)
+        self.fitter.setErrors(errors)
 
-    def setParameters(self, order, precision, repetition):
+    def setLoss(self, loss = 'linear', f_scale = 1.):
+        '''
+        Select the loss function of the fit, one of 
+        'linear', 'soft_l1', 'huber' and 'cauchy', and
+        the residual at which the robust losses start
+        to reduce the influence of the points.
+        '''
+        self.fitter.loss = loss
+        self.fitter.f_scale = float(f_scale)
+
+    def setMode(self, mode):
+        '''
+        Select the fit engine, 'sequential' fits one 
+        parameter at a time and 'joint' all the free 
+        parameters at once.
+        '''
+        self.fitter.mode = mode
+
+    def setParameters(self, order, repetition):
         '''
         This function is aimed at setting the parameters
         that are not represented in the local function.
+        Input: 
+        - order (int list) the functions to fit in order
+        - repetition (int) the sweeps of the sequential
+          fit
         '''
         self.fitter.container = [
             order,
-            precision,
             repetition
             ]
 
@@ -103,19 +129,78 @@ class Fitter(QtCore.QObject):
         self.x = []
         self.y = []
         self.functions = {}
+        self.mode = 'sequential'
+        self.covariance = None
+        self.weights = None
+        self.loss = 'linear'
+        self.f_scale = 1.
+        self.use_jacobian = True
+        self._components = {}
+        self._changed = set()
+        self._total = None
+        self._updates = 0
+        self.resum = 64
+
+    def setErrors(self, errors = None):
+        '''
+        Set the weights of the points from their error
+        bars. Points without a positive finite error 
+        do not contribute.
+        Input: 
+        - errors (array) or None for equal weights
+        '''
+        if errors is None:
+            self.weights = None
+            return
+
+        errors = np.ravel(np.asarray(errors, dtype = 'float64'))
+        valid = np.isfinite(errors) & (errors > 0)
+        self.weights = np.zeros(errors.shape)
+        self.weights[valid] = 1. / errors[valid]
+
+    def weighted(self, residual):
+        '''
+        Return the residual as a flat vector weighted
+        by the inverse error bars.
+        Input: 
+        - residual (array)
+        '''
+        residual = np.ravel(residual)
+        if self.weights is None:
+            return residual
+        return residual * self.weights
+
+    def jacobianColumn(self, derivative, y):
+        '''
+        The column of the jacobian of the weighted 
+        residual y - f from the derivative of f with
+        respect to one parameter.
+        Input: 
+        - derivative (array) of f
+        - y (array) the data of the residual
+        '''
+        derivative = np.asarray(derivative, dtype = 'float64')
+        return -self.weighted(np.broadcast_to(
+            derivative, np.broadcast_shapes(derivative.shape, np.shape(y))))
 
     def fit(self):
         '''
         perform the fit. Loop over all functions and all
         parameters and then check if it is fixed and if not
-        proceed. 
+        proceed. In the joint mode all the free 
+        parameters are fitted in one pass.
         '''
+        if self.mode == 'joint':
+            self.fitJoint()
+            return
+
         pointer     = self.container[0]
         keys        = [key for key in self.functions.keys()] 
         self.setProgressVal()
+        self.resetModel()
         i = 0
 
-        for k, l in itertools.product(range(self.container[2]), pointer):
+        for k, l in itertools.product(range(self.container[1]), pointer):
 
             # set the progress
             self.progress_str.emit('Fitting the '+str(keys[l]) + 'functions')
@@ -142,6 +227,138 @@ class Fitter(QtCore.QObject):
                         self.functions[keys[l]][0].para_proc[1][n])
                 i += 1
 
+    def fitJoint(self):
+        '''
+        Fit every free parameter of every function at 
+        once. The parameters are packed into a single 
+        vector with their bounds and handed to one 
+        least_squares call. The covariance of the free
+        parameters is returned and the errors are set
+        on the functions.
+        Output: 
+        - covariance (ndarray) in the order of 
+          self.targets
+        '''
+        self.progress_str.emit('Fitting all functions jointly')
+        self.progress_int.emit(0)
+
+        self.targets = []
+        start = []
+        lower = []
+        upper = []
+        for key in self.functions.keys():
+            for element in self.functions[key][2]:
+                element.x = self.x
+                element.calculated = False
+                for n in range(element.info.para_num):
+                    element.para_err[n] = 0.
+                    if element.para_fix[n]: 
+                        continue
+                    bounds, para = self.fetchBounds(
+                        float(element.paras[n]),
+                        element.info.para_bound[n*2][2],
+                        element.info.para_bound[n*2][:2],
+                        element.info.para_bound[n*2+1][2],
+                        element.info.para_bound[n*2+1][:2])
+                    if not bounds[0] < bounds[1]:
+                        continue
+                    self.targets.append([element, n])
+                    start.append(min(max(para, bounds[0]), bounds[1]))
+                    lower.append(bounds[0])
+                    upper.append(bounds[1])
+
+        self.covariance = np.zeros((0, 0))
+        if len(self.targets) == 0:
+            self.progress_int.emit(100)
+            return self.covariance
+
+        analytic = self.use_jacobian and all(
+            element.hasJacobian() for element, n in self.targets)
+        result = least_squares(
+            self.jointResidue,
+            np.asarray(start, dtype = 'float64'),
+            jac = self.jointJacobian if analytic else '2-point',
+            bounds = (lower, upper),
+            loss = self.loss,
+            f_scale = self.f_scale,
+            verbose = 0)
+
+        self.setJointParameters(result.x)
+        self.covariance = self.estimateCovariance(result)
+        for i, (element, n) in enumerate(self.targets):
+            element.para_err[n] = float(np.sqrt(np.abs(self.covariance[i, i])))
+
+        self.progress_int.emit(100)
+        return self.covariance
+
+    def setJointParameters(self, p):
+        '''
+        Write the values of the parameter vector into
+        the functions.
+        '''
+        for (element, n), value in zip(self.targets, p):
+            element.paras[n] = float(value)
+            element.calculated = False
+
+    def model(self):
+        '''
+        The sum of all the functions at self.x.
+        '''
+        data = 0.
+        for key in self.functions.keys():
+            for element in self.functions[key][2]:
+                data = data + element.returnData(self.x)
+        return data
+
+    def jointResidue(self, p):
+        '''
+        The residual vector of the joint fit.
+        Input: 
+        - p (ndarray) the free parameters
+        '''
+        self.setJointParameters(p)
+        return self.weighted(self.y - self.model())
+
+    def jointJacobian(self, p):
+        '''
+        The jacobian of the residual vector of the 
+        joint fit from the analytic derivatives of 
+        the functions. Each function is derived once.
+        Input: 
+        - p (ndarray) the free parameters
+        '''
+        self.setJointParameters(p)
+        derivatives = {}
+        columns = []
+        for element, n in self.targets:
+            if not id(element) in derivatives:
+                derivatives[id(element)] = element.returnJacobian(self.x)
+            columns.append(self.jacobianColumn(
+                derivatives[id(element)][n], self.y))
+        return np.stack(columns, axis = 1)
+
+    def estimateCovariance(self, result):
+        '''
+        The covariance of the parameters from the 
+        jacobian of the solution, as in curve_fit. 
+        The pseudo inverse drops the singular values 
+        at the noise level and the result is scaled
+        by the reduced chi square.
+        Input: 
+        - result (OptimizeResult)
+        '''
+        jacobian = np.atleast_2d(result.jac)
+        _, singular, vt = np.linalg.svd(jacobian, full_matrices = False)
+        threshold = np.finfo(float).eps * max(jacobian.shape) * singular[0]
+        vt = vt[singular > threshold]
+        singular = singular[singular > threshold]
+        covariance = np.dot(vt.T / singular**2, vt)
+
+        dof = result.fun.size - result.x.size
+        if dof > 0:
+            return covariance * 2 * result.cost / dof
+        return np.full(covariance.shape, np.inf)
+
     def setProgressVal(self):
         '''
         Prepare the progress report by setting the
@@ -151,7 +368,7 @@ class Fitter(QtCore.QObject):
         keys        = [key for key in self.functions.keys()] 
         self.max_progress = 0
 
-        for k, l in itertools.product(range(self.container[2]), pointer):
+        for k, l in itertools.product(range(self.container[1]), pointer):
             for o,m,n in itertools.product(
                 range(self.functions[keys[l]][0].para_proc[0]),
                 range(len(self.functions[keys[l]][2])),
@@ -182,29 +399,41 @@ class Fitter(QtCore.QObject):
             fit_target.info.para_bound[(int(parameter)*2+1)][2],
             fit_target.info.para_bound[(int(parameter)*2+1)][:2])
 
+        jacobian = '2-point'
+        if self.use_jacobian and fit_target.hasJacobian():
+            jacobian = lambda p, *args: self.jacobianColumn(
+                fit_target.fitJacobian(p), y)[:, np.newaxis]
+
         fit_target.paras[int(parameter)] = float(
             least_squares(
                 self.residue,
                 bounds[1],
+                jac = jacobian,
                 args = (
                     fit_target.fitWrapper,
                     y, 
                     temp_y),
                 bounds = bounds[0],
+                loss = self.loss,
+                f_scale = self.f_scale,
                 verbose=0).x[0])
 
+        self._changed.add((selected[0], selected[1]))
+
     def residue(self,p,function,y, temp_y):
         '''
         This is the residual function that evaluates 
         the deference between the data
-        and the fit. This function needs:
+        and the fit. It returns the weighted residual 
+        vector so that least_squares can apply its 
+        loss and use the structure of the problem.
+        This function needs:
         - function: the function (Lorenzian, Linear ...) it will fit.
         - p: the parameter to evaluate
         - y: the curve to compare
         - x: the axis to feed.
         '''
-        err = np.sum([abs(l) for l in y - (function(p) + temp_y)])*self.container[1]
-        return err
+        return self.weighted(y - (function(p) + temp_y))
 
     def fetchBounds(self, para, rel_bool, rel_bound, abs_bool, abs_bound):
         '''
@@ -265,18 +494,72 @@ class Fitter(QtCore.QObject):
 
         return [LowerBound, UpperBound], para
 
+    def resetModel(self):
+        '''
+        Evaluate every function at self.x and keep 
+        the outputs and their running total.
+        '''
+        self._components = {}
+        self._changed = set()
+        for key in self.functions.keys():
+            for m, element in enumerate(self.functions[key][2]):
+                element.calculated = False
+                self._components[(key, m)] = element.quickReturn(self.x)
+        self.sumModel()
+
+    def sumModel(self):
+        '''
+        Sum the cached outputs of the functions into
+        the total again. The running total is updated
+        by differences, so this drops the rounding 
+        errors they accumulate.
+        '''
+        self._updates = 0
+        self._total = np.zeros(np.shape(self.y))
+        for output in self._components.values():
+            self._total = self._total + output
+
+    def updateModel(self, ignore = None):
+        '''
+        Evaluate the functions whose parameters were 
+        changed again and update the running total. 
+        The ignored function is left as it is since 
+        the total minus its cached output does not 
+        depend on it. Every self.resum updates the 
+        total is summed again from the outputs.
+        Input: 
+        - ignore (tuple) the function to leave out
+        '''
+        for selected in list(self._changed):
+            if selected == ignore:
+                continue
+            element = self.functions[selected[0]][2][selected[1]]
+            element.calculated = False
+            output = element.quickReturn(self.x)
+            self._total += output
+            self._total -= self._components[selected]
+            self._components[selected] = output
+            self._changed.discard(selected)
+            self._updates += 1
+
+        if self._updates >= self.resum:
+            self.sumModel()
+
     def constructor(self,ignore = None , data = None, x = None):
         '''
         This function will try to create the
         data minus all the functions that are not 
-        currently being fitted.
+        currently being fitted. It is read from the 
+        running total of the model and the cached 
+        output of the ignored function.
         '''
-        data = np.zeros(data.shape)
+        if self._total is None:
+            self.resetModel()
+        if ignore is None:
+            self.updateModel()
+            return np.array(self._total)
 
-        for key in self.functions.keys():
-            for m in range(len(self.functions[key][2])):
-                if not [key,m] == ignore:
-                    data = data + self.functions[key][2][m].quickReturn(x)
-
-        return data
+        ignore = (ignore[0], ignore[1])
+        self.updateModel(ignore)
+        return self._total - self._components[ignore]
     
\ No newline at end of file
@@ -64,6 +64,7 @@ class FunctionClass:
         self.paras      = list([e[1] for e in self.info.para_name])
         self.para_ini   = list([e[1] for e in self.info.para_name])
         self.para_fix   = list(self.info.para_fix_ini)
+        self.para_err   = [0. for e in self.info.para_name]
         self.calculated = False
         self.x          = []
         self.current_par= 0
@@ -78,6 +79,22 @@ class FunctionClass:
         '''
 
         return self.x
+
+    def jacobian(self,para):
+        '''
+        To be changed after inheritance. Returns the
+        derivatives of the function with respect to 
+        each parameter, one row per parameter with 
+        para in the layout of self.function. Without 
+        it the fitter uses finite differences.
+        '''
+        return None
+
+    def hasJacobian(self):
+        '''
+        Check if the child defines the jacobian.
+        '''
+        return not type(self).jacobian is FunctionClass.jacobian
     
     def compute(self,x):
         '''
@@ -107,6 +124,17 @@ class FunctionClass:
 
         return self.function(paras)
 
+    def returnJacobian(self,x):
+        '''
+        The derivatives of the function with respect 
+        to its parameters at the given input.
+        '''
+        paras = [x]
+        for i in range(self.info.para_num):
+            paras.append(self.paras[i])
+
+        return self.jacobian(paras)
+
     def fitWrapper(self,val):
         '''
         This function serves to return the already computed function
@@ -119,6 +147,18 @@ class FunctionClass:
         paras[self.current_par + 1] = val
         return self.function(paras)
 
+    def fitJacobian(self,val):
+        '''
+        The derivative of the function with respect to
+        the parameter currently fitted, the counterpart
+        of fitWrapper for the jacobian.
+        '''
+        paras = [self.x]
+        for element in self.paras:
+            paras.append(float(element))
+        paras[self.current_par + 1] = val
+        return self.jacobian(paras)[self.current_par]
+
     def quickReturn(self, x):
         '''
         This function serves to return the already computed function
@@ -150,4 +190,5 @@ class FunctionClass:
         self.paras          = list(source.paras)
         self.para_ini       = list(source.para_ini)
         self.para_fix       = list(source.para_fix)
+        self.para_err       = list(source.para_err)
         
\ No newline at end of file
@@ -94,4 +94,11 @@ class Baseline(FunctionClass):
         #process the function
         y           = np.zeros(x.shape[0]) + Offset
         return y
+
+    def jacobian(self,para):
+        '''
+        The derivative with respect to the offset
+        '''
+        x           = np.asarray(para[0])
+        return [np.ones(x.shape[0])]
     
\ No newline at end of file
@@ -108,4 +108,19 @@ class Linear(FunctionClass):
         #process the function
         y           = ( x - Position ) * Factor + Offset
         return y
+
+    def jacobian(self,para):
+        '''
+        The derivatives with respect to the position,
+        the amplitude and the offset
+        '''
+        #function parameters
+        x           = np.asarray(para[0])
+        Position    = para[1]
+        Factor      = para[2]
+
+        return [
+            np.zeros(x.shape) - Factor,
+            x - Position,
+            np.ones(x.shape)]
     
\ No newline at end of file
@@ -117,4 +117,31 @@ class Lorenzian(FunctionClass):
         y           = (Amplitude*(HWHM**2)/((((x-Position))**2)+HWHM**2))
 
         return y
+
+    def jacobian(self,para):
+        '''
+        The derivatives with respect to the position,
+        the HWHM, the amplitude and the asymmetry.
+        '''
+        #function parameters
+        x           = np.asarray(para[0])
+        Position    = para[1]
+        HWHM_0      = para[2]
+        Amplitude   = para[3]
+        Asymmetry   = para[4]
+
+        #process the function
+        shift       = x-Position
+        sigmoid     = 1/(1+np.exp(Asymmetry*shift))
+        HWHM        = 2*HWHM_0*sigmoid
+        denominator = shift**2+HWHM**2
+        d_HWHM      = 2*Amplitude*HWHM*shift**2/denominator**2
+        d_sigmoid   = sigmoid*(1-sigmoid)
+
+        return [
+            2*Amplitude*HWHM**2*shift/denominator**2
+            + d_HWHM*2*HWHM_0*Asymmetry*d_sigmoid,
+            d_HWHM*2*sigmoid,
+            HWHM**2/denominator,
+            -d_HWHM*2*HWHM_0*shift*d_sigmoid]
     
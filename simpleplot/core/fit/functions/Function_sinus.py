@@ -119,3 +119,23 @@ class Sinus(FunctionClass):
         #return the function
         return y
 
+    def jacobian(self,para):
+        '''
+        The derivatives with respect to the phase, the
+        factor, the amplitude and the offset
+        '''
+        #function parameters
+        x           = np.array(para[0])
+        Phase       = para[1]
+        Factor      = para[2]
+        Amplitude   = para[3]
+
+        #process the function
+        cosine      = np.cos(x*Factor + Phase)
+
+        return [
+            Amplitude*cosine,
+            Amplitude*x*cosine,
+            np.sin(x*Factor + Phase),
+            np.ones(x.shape)]
+
@@ -0,0 +1,267 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import json
+import os
+import zipfile
+import numpy as np
+
+try:
+    import h5py
+    HAVE_HDF5 = True
+except ImportError:
+    HAVE_HDF5 = False
+
+CHUNK_BYTES = 1024**2
+
+def binary_path(path):
+    '''
+    Return the path of the binary file that is 
+    written for a given path. Without h5py the 
+    arrays are written to an npz archive.
+    Input: 
+    - path (str) with or without extension
+    '''
+    root, extension = os.path.splitext(path)
+    if extension in ['.h5', '.hdf5', '.npz']:
+        path = root
+    return path + ('.h5' if HAVE_HDF5 else '.npz')
+
+def chunk_shape(shape, dim, itemsize):
+    '''
+    Chunks of whole objects along the structure 
+    axes, grown on the last structure axis up to
+    about CHUNK_BYTES so that a slice only touches
+    the chunks it contains.
+    Input: 
+    - shape (tuple) of the payload
+    - dim (int) number of structure axes
+    - itemsize (int) bytes per element
+    '''
+    chunk = [1] * dim + list(shape[dim:])
+    if dim == 0:
+        return tuple(shape)
+    object_bytes = max(int(np.prod(chunk)) * itemsize, 1)
+    chunk[dim - 1] = int(max(1, min(shape[dim - 1], CHUNK_BYTES // object_bytes)))
+    return tuple(chunk)
+
+def write_arrays(path, arrays, header, dim = 0):
+    '''
+    Write named arrays and a header dictionary into
+    a single binary file. The payload named 'data'
+    is chunked in hdf5. In the npz fallback nothing
+    is compressed so that the members can be memory
+    mapped again.
+    Input: 
+    - path (str) with the .h5 or .npz extension
+    - arrays (dict) name: ndarray
+    - header (dict) json serialisable
+    - dim (int) the structure axes of 'data'
+    '''
+    if path.endswith('.npz'):
+        arrays = dict(arrays)
+        arrays['header'] = np.asarray(json.dumps(header))
+        np.savez(path, **arrays)
+        return
+
+    with h5py.File(path, 'w') as f:
+        f.attrs['header'] = json.dumps(header)
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            if array.dtype.kind == 'U':
+                f.create_dataset(
+                    name, data = array.astype(object), 
+                    dtype = h5py.string_dtype())
+            elif name == 'data' and array.ndim > 0 and array.size > 0:
+                f.create_dataset(
+                    name, data = array, 
+                    chunks = chunk_shape(array.shape, dim, array.itemsize))
+            else:
+                f.create_dataset(name, data = array)
+
+class BinaryReader:
+    '''
+    This class reads the files written by 
+    write_arrays. Arrays are only read when they 
+    are requested and the payload can be read in 
+    parts. In the npz fallback the members are 
+    memory mapped directly in the archive.
+    '''
+    def __init__(self, path):
+        '''
+        Input: 
+        - path (str) the .h5 or .npz file
+        '''
+        self.path       = path
+        self._file      = None
+        self._members   = {}
+
+        if path.endswith('.npz'):
+            self._file = zipfile.ZipFile(path, 'r')
+            self._members = {
+                info.filename[:-4] : info 
+                for info in self._file.infolist()}
+            self.header = json.loads(str(self.array('header')))
+        else:
+            if not HAVE_HDF5:
+                raise ImportError("h5py is required to read " + path)
+            self._file = h5py.File(path, 'r')
+            self.header = json.loads(self._file.attrs['header'])
+
+    def __contains__(self, name):
+        if self._members:
+            return name in self._members
+        return name in self._file
+
+    def close(self):
+        '''
+        Release the file handle.
+        '''
+        if not self._file is None:
+            self._file.close()
+            self._file = None
+
+    def array(self, name, mmap = False):
+        '''
+        Return a named array. 
+        Input: 
+        - name (str)
+        - mmap (bool) return a copy on write memory
+          map instead of reading the array
+        '''
+        if not self._members:
+            dataset = self._file[name]
+            if h5py.check_string_dtype(dataset.dtype) is not None:
+                return dataset.asstr()[()]
+            return dataset[()]
+
+        info = self._members[name]
+        if not mmap or not info.compress_type == zipfile.ZIP_STORED:
+            with self._file.open(info) as f:
+                return np.lib.format.read_array(f, allow_pickle = False)
+        return self._memmap(info)
+
+    def shape(self, name):
+        '''
+        Return the shape of an array without reading
+        it.
+        Input: 
+        - name (str)
+        '''
+        if not self._members:
+            return self._file[name].shape
+        with self._file.open(self._members[name]) as f:
+            return read_npy_header(f)[0]
+
+    def read(self, name, index):
+        '''
+        Read a part of an array. Only the touched 
+        chunks or pages are read from the disk.
+        Input: 
+        - name (str)
+        - index (tuple) of ints and slices
+        '''
+        if not self._members:
+            return self._file[name][index]
+        return np.array(self.array(name, mmap = True)[index])
+
+    def _memmap(self, info):
+        '''
+        Memory map an uncompressed member of the npz
+        archive.
+        Input: 
+        - info (ZipInfo)
+        '''
+        return memmap_member(self.path, info)
+
+def read_npy_header(f):
+    '''
+    Read the header of an npy file and leave the
+    file at the start of the array.
+    Input: 
+    - f (file) at the start of the npy file
+    Output: 
+    - shape, fortran_order, dtype
+    '''
+    if np.lib.format.read_magic(f) == (1, 0):
+        return np.lib.format.read_array_header_1_0(f)
+    return np.lib.format.read_array_header_2_0(f)
+
+def memmap_member(path, info):
+    '''
+    Memory map an uncompressed member of an npz 
+    archive in copy on write mode. The local header
+    of the member is skipped to find the start of 
+    the npy file.
+    Input: 
+    - path (str) the archive
+    - info (ZipInfo) the member
+    '''
+    with open(path, 'rb') as f:
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        start = (
+            info.header_offset + 30 
+            + int.from_bytes(local_header[26:28], 'little')
+            + int.from_bytes(local_header[28:30], 'little'))
+        f.seek(start)
+        shape, fortran, dtype = read_npy_header(f)
+        offset = f.tell()
+
+    return np.memmap(
+        path, dtype = dtype, mode = 'c', offset = offset, 
+        shape = shape, order = 'F' if fortran else 'C')
+
+def numpy_shape(path):
+    '''
+    Return the shape of the array of a .npy file or
+    of the first array of a .npz archive from the 
+    header only.
+    Input: 
+    - path (str)
+    '''
+    if path.endswith('.npz'):
+        with zipfile.ZipFile(path, 'r') as archive:
+            with archive.open(archive.infolist()[0]) as f:
+                return read_npy_header(f)[0]
+    with open(path, 'rb') as f:
+        return read_npy_header(f)[0]
+
+def open_numpy(path):
+    '''
+    Open the array of a .npy file or the first array
+    of a .npz archive as a copy on write memory map.
+    Compressed archives can not be mapped and are 
+    read.
+    Input: 
+    - path (str)
+    '''
+    if path.endswith('.npz'):
+        with zipfile.ZipFile(path, 'r') as archive:
+            info = archive.infolist()[0]
+            if not info.compress_type == zipfile.ZIP_STORED:
+                with archive.open(info) as f:
+                    return np.lib.format.read_array(f, allow_pickle = False)
+        return memmap_member(path, info)
+    return np.load(path, mmap_mode = 'c')
@@ -23,6 +23,8 @@
 
 
 from ..io import io_file_methods as file_methods 
+from ..io.io_binary import BinaryReader, binary_path, numpy_shape, open_numpy
+from ..data.metadata_table import MetadataTable
 import itertools
 import os
 import datetime
@@ -45,74 +47,187 @@ class IODataLoad:
         '''
         if file_format == "txt":
             self._loadFromTxt()
-        elif file_format == "hdf5":
+        elif file_format in ["hdf5", "h5", "npz"]:
             self._loadFromHdf5()
+        elif file_format == "store":
+            self._loadFromStore()
 
     def previewFromNumpy(self):
         '''
-        This will in fact load the file through 
-        the numpy channel.
+        Return the shape of the numpy file. For binary
+        files only the header is read.
         '''
         extension = self._path.split(".")[-1]
 
         if extension == 'npy' or extension == 'npz':
-            data = np.load(self._path)
+            return tuple(numpy_shape(self._path))
         elif extension == 'txt':
-            data = np.loadtxt(self._path)
-
-        return data.shape
+            return np.loadtxt(self._path).shape
 
     def loadFromNumpy(self, data_axes):
         '''
         This will in fact load the file through 
-        the numpy channel.
+        the numpy channel. Binary files are memory 
+        mapped in copy on write mode and adopted as 
+        the dense buffer of the target, so nothing is
+        read before it is accessed and the file is 
+        never written. The axes flagged in data_axes 
+        are the axes of the structure, the others the
+        axes of the data of each object.
+        Input: 
+        - data_axes (bool list) one per array axis
         '''
         extension = self._path.split(".")[-1]
 
         if extension == 'npy' or extension == 'npz':
-            data = np.load(self._path)
+            data = open_numpy(self._path)
         elif extension == 'txt':
             data = np.loadtxt(self._path)
 
-        loop_elements = [
-            [ l for l in range(i)] 
-            for i in data.shape]
-
-        get_index = []
-        for i, element in enumerate(data_axes):
-            if not element:
-                get_index.append(slice(len(loop_elements[i])))
-            else:
-                get_index.append(None)
-
-        loop_elements = itertools.compress(loop_elements, data_axes)
-        for e in itertools.product(*loop_elements):
-            local_index = list(get_index)
-            idx = 0
-            for i, element in enumerate(data_axes):
-                if element:
-                    local_index[i] = e[idx]
-                    idx += 1
-            self._target.addDataObject(
-                data.__getitem__(tuple(local_index)), e)
-        
-        self._target.validate()
+        structure_axes = [i for i, element in enumerate(data_axes) if element]
+        object_axes = [i for i, element in enumerate(data_axes) if not element]
+        if not structure_axes == list(range(len(structure_axes))):
+            data = np.transpose(data, structure_axes + object_axes)
+
+        self._target.adoptBuffer(data, len(structure_axes))
 
     def _loadFromTxt(self):
         '''
-        load from txt files
+        load from txt files. Only the header is read 
+        as lines, the data block is streamed from the
+        file in chunks.
         '''
         with open(self._path, 'r') as f:
-            lines = f.readlines()
+            lines = self._headerReader(f)
             line_idx = self._getLines(lines)
 
             self._dimAnalyser(lines, line_idx[1], line_idx[2])
             self._subdimAnalyser(lines, line_idx[2], line_idx[3])
             self._subaxisReader(lines, line_idx[2], line_idx[3])
 
-            self._dataReader(lines,line_idx[3])
+            if not self._dataReader(f):
+                return
             self._axisReader(lines,line_idx[1], line_idx[2])
 
+    def _headerReader(self, f):
+        '''
+        Read the lines of the file up to and including
+        the DATA marker and leave the file at the 
+        first line of data.
+        '''
+        lines = []
+        for line in f:
+            lines.append(line)
+            if ' DATA ' in line[:50]:
+                break
+        return lines
+
+    def _binaryReader(self):
+        '''
+        Open the binary file of the path. If the path
+        has no binary file the one the saver would 
+        have written is used.
+        '''
+        path = self._path
+        if not os.path.isfile(path):
+            path = binary_path(path)
+        return BinaryReader(path)
+
+    def _loadFromHdf5(self):
+        '''
+        Load a binary file written by IODataSave. The
+        payload is adopted as the buffer of the target
+        in one block. In an npz archive it is memory 
+        mapped and only read when it is accessed.
+        '''
+        reader = self._binaryReader()
+        header = reader.header
+        dim = header['dim']
+
+        subaxis_types = header.get('subaxis_types', ['float'] * header['subaxes'])
+        subaxes = [
+            self._axisList(reader.array('subaxis_' + str(i)), subaxis_types[i])
+            for i in range(header['subaxes'])]
+        self._target.adoptBuffer(
+            reader.array('data', mmap = True), dim,
+            axes = None if len(subaxes) == 0 
+            else np.asarray(subaxes) if len(subaxes)>1 
+            else np.asarray(subaxes[0]))
+
+        axis_types = header.get('axis_types', ['float'] * dim)
+        for i in range(dim):
+            self._target.axes.set_name(i, name = header['names'][i])
+            self._target.axes.set_unit(i, unit = header['units'][i])
+            self._target.axes.set_axis(
+                i, axis = self._axisList(
+                    reader.array('axis_' + str(i)), axis_types[i]))
+
+        if len(header['meta_names']) > 0:
+            table = MetadataTable()
+            for i, name in enumerate(header['meta_names']):
+                table.setColumn(
+                    name, reader.array('meta_' + str(i)),
+                    reader.array('meta_present_' + str(i)),
+                    header['meta_types'][i], header['meta_units'][i])
+            self._target.injectMetadataTable(table)
+            self._target.DataObjects.linked = True
+
+        reader.close()
+
+    def _axisList(self, array, axis_type):
+        '''
+        Restore an axis of a binary file as a list of
+        its type.
+        Input: 
+        - array (ndarray)
+        - axis_type (str) 'int', 'float' or 'str'
+        '''
+        if axis_type == 'str':
+            return [str(element) for element in np.asarray(array).ravel()]
+        elif axis_type == 'int':
+            return np.asarray(array).astype('int64').tolist()
+        return np.asarray(array).astype('float64').tolist()
+
+    def readSlice(self, index):
+        '''
+        Read a selection of the payload of a binary 
+        file without loading the rest of it. 
+        Input: 
+        - index (tuple) of ints and slices over the
+          structure axes followed by the data axes
+        Output: 
+        - the selection (ndarray)
+        '''
+        reader = self._binaryReader()
+        output = reader.read('data', tuple(index))
+        reader.close()
+        return output
+
+    def _loadFromStore(self):
+        '''
+        Open a store directory written by IODataSave.
+        The payload is memory mapped and adopted as 
+        the buffer of the target so that nothing is
+        read before it is accessed.
+        '''
+        with open(os.path.join(self._path, "axes.txt"), 'r') as f:
+            lines = f.readlines()
+        line_idx = self._getLines(lines)
+
+        self._subaxisReader(lines, line_idx[2], line_idx[3])
+        payload_path = os.path.join(
+            self._path, lines[line_idx[3] + 1].strip('\n'))
+
+        self._target.adoptBuffer(
+            np.load(payload_path, mmap_mode = 'r+'),
+            line_idx[2] - line_idx[1] - 1,
+            axes = np.asarray(self._subaxis) 
+            if len(self._subaxis)>1 
+            else np.asarray(self._subaxis[0]),
+            path = payload_path)
+
+        self._axisReader(lines,line_idx[1], line_idx[2])
+
     def _getLines(self, lines):
         '''
         This routine will determine the lines at
@@ -155,14 +270,11 @@ class IODataLoad:
         '''
         '''
         for idx, axis_str in enumerate(lines[start_line+1:end_line]):
-            self._target.axes.set_name(
-                idx, name = axis_str.strip('\n').split('**')[1])
-            self._target.axes.set_unit(
-                idx, unit = axis_str.strip('\n').split('**')[2])
+            elements = axis_str.strip('\n').split('**')
+            self._target.axes.set_name(idx, name = elements[1])
+            self._target.axes.set_unit(idx, unit = elements[2])
             self._target.axes.set_axis(
-                idx, axis = [
-                    float(e) for e in 
-                    axis_str.strip('\n').split('**')[3].split(',')])
+                idx, axis = [float(e) for e in elements[3].split(',')])
 
     def _subaxisReader(self,lines, start_line, end_line):
         '''
@@ -170,30 +282,45 @@ class IODataLoad:
         self._subaxis = []
         for idx, axis_str in enumerate(lines[start_line+1:end_line]):
             self._subaxis.append([
-                float(e) for e in 
-                axis_str.strip('\n').split('**')[2].split(',')])
+                float(e) for e in axis_str.strip('\n').split('**')[2].split(',')])
 
-    def _dataReader(self, lines, start_line):
+    def _dataReader(self, f, chunk_values = 2**20):
         '''
-        This routine will read in the data and then 
-        send it immediately to the datastructures.
+        This routine will read in the data block of 
+        an open file and then adopt it as the dense
+        buffer of the datastructure. The lines are 
+        converted in chunks of about chunk_values 
+        numbers directly into the buffer so that 
+        only one chunk of text is held at a time.
+        Input: 
+        - f (file) at the first line of data
+        - chunk_values (int) numbers per chunk
+        Output: 
+        - False if the data block does not match 
+          the axes and nothing was loaded
         '''
-        loop_elements = [
-            [ l for l in range(i)] 
-            for i in self._dims]
+        per_object = int(np.prod(self._subdims))
+        objects = int(np.prod(self._dims))
+        data = np.empty((objects, per_object), dtype = 'float64')
+        chunk_lines = max(1, chunk_values // max(per_object, 1))
 
-        line_num = start_line + 1
-        for e in itertools.product(*loop_elements):
-            self._target.addDataObject(
-                np.asarray([
-                    float(e) for e in 
-                    lines[line_num].strip('\n').split(',')]).reshape(
-                        tuple(self._subdims)),
-                e, axes = np.asarray(self._subaxis) 
-                if len(self._subaxis)>1 
-                else np.asarray(self._subaxis[0])
-            )
-            line_num += 1
+        start = 0
+        while start < objects:
+            rows = min(chunk_lines, objects - start)
+            try:
+                data[start:start + rows] = np.loadtxt(
+                    itertools.islice(f, rows), delimiter = ',', 
+                    dtype = 'float64', ndmin = 2)
+            except ValueError:
+                print("The data block does not match the axes")
+                return False
+            start += rows
 
-        self._target.validate()
+        self._target.adoptBuffer(
+            data.reshape(tuple(self._dims) + tuple(self._subdims)),
+            len(self._dims),
+            axes = np.asarray(self._subaxis) 
+            if len(self._subaxis)>1 
+            else np.asarray(self._subaxis[0]))
 
+        return True
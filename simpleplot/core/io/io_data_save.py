@@ -22,8 +22,10 @@
 # *****************************************************************************
 
 from .io_file_methods import *
-import itertools
+from .io_binary import write_arrays, binary_path
 import datetime
+import os
+import numpy as np
 
 class IODataSave:
     '''
@@ -33,13 +35,19 @@ class IODataSave:
     eventually also saves in the project folder.
     '''
 
-    def __init__(self, source, path:str):
+    def __init__(self, source, path:str, float_format = '%.17g'):
         '''
         define the local elements and proceed with the 
         saving procedure.
+        Input: 
+        - source (DataStructure)
+        - path (str)
+        - float_format (str) the format of the values
+          in text files as for np.savetxt
         '''
         self._source = source
         self._path = path
+        self._float_format = float_format
 
     def save(self, file_format:str):
         '''
@@ -47,21 +55,54 @@ class IODataSave:
         '''
         if file_format == "txt":
             self._saveToTxt()
-        elif file_format == "hdf5":
-            self._saveToTxt()
+        elif file_format in ["hdf5", "h5", "npz"]:
+            self._saveToHdf5()
+        elif file_format == "store":
+            self._saveToStore()
 
     def _saveToTxt(self):
         '''
-        Save the dataset to text ...
+        Save the dataset to text. The header is 
+        written first and the data is then streamed
+        to the file.
+        '''
+        with open(self._path+".txt", "w") as f:
+            f.write(self._metaWriter())
+            f.write(self._axisWriter())
+            f.write(self._subaxisWriter())
+            self._dataWriter(f)
+
+    def _saveToStore(self):
+        '''
+        Save the dataset as a store directory. The 
+        payload is written as a .npy file that can 
+        be memory mapped and the axes are written 
+        in the header format of the text files. 
         '''
-        metadata_string = self._metaWriter()
-        axis_string = self._axisWriter()
-        subaxis_string = self._subaxisWriter()
-        data_string = self._dataWriter()
+        path = self._path + ".store"
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        payload_path = os.path.join(path, "data.npy")
+        data = self._source.returnAsNumpy()
 
-        self._writeTxtFile(
-            metadata_string, axis_string, 
-            subaxis_string, data_string)
+        if self._source.storage_path == os.path.abspath(payload_path):
+            self._source.flush()
+        else:
+            payload = np.lib.format.open_memmap(
+                payload_path, mode = 'w+', 
+                dtype = data.dtype, shape = data.shape)
+            for i in range(data.shape[0]):
+                payload[i] = data[i]
+            payload.flush()
+            del payload
+
+        with open(os.path.join(path, "axes.txt"), "w") as f:
+            f.write(self._metaWriter())
+            f.write(self._axisWriter())
+            f.write(self._subaxisWriter())
+            f.write("#################   DATA   ###################\n")
+            f.write("data.npy\n")
 
     def _metaWriter(self):
         '''
@@ -106,61 +147,126 @@ class IODataSave:
         output = ""
         output += "################   SUBAXIS   #################\n"
 
+        for i, subaxis in enumerate(self._subaxes()):
+            output += "**" + str(i) + "**" + self._listToString(subaxis) + "\n"
+
+        return output
+
+    def _subaxes(self):
+        '''
+        Return the axes of the data of the objects 
+        as lists, one per dimension of the data.
+        '''
         data_dummy = self._source.DataObjects[0]
         dim = len(data_dummy.data.shape)
-        
+
+        output = []
         for i in range(dim):
-            temp_out = "**" + str(i) + "**"
             if dim == 1 and not data_dummy.axes is None:
-                temp_out += self._listToString(data_dummy.axes.tolist())
-            elif dim == 1 and data_dummy.axes is None:
-                temp_out += self._listToString([
-                    j for j in range(data_dummy.data.shape[i])])
+                output.append(np.asarray(data_dummy.axes).tolist())
             elif dim == 2 and not data_dummy.axes is None:
-                temp_out += self._listToString(data_dummy.axes[i].tolist())
-            elif dim == 2 and data_dummy.axes is None:
-                temp_out += self._listToString(
-                    [j for j in range(data_dummy.data.shape[i])])
-            output += temp_out + "\n"
+                output.append(np.asarray(data_dummy.axes[i]).tolist())
+            else:
+                output.append([j for j in range(data_dummy.data.shape[i])])
 
         return output
 
-    def _dataWriter(self):
+    def _dataWriter(self, f, chunk_values = 2**20):
         '''
-        This method will generate a string with the 
-        input being a list of strings that are
-        common to all files...
+        This method will write the data section to 
+        the open file, one line per object in the 
+        order of the map. The dense array is written
+        in chunks of about chunk_values numbers so 
+        that only one chunk of text exists at a time.
+        Input: 
+        - f (file) the open text file
+        - chunk_values (int) numbers per chunk
         '''
-        output = ""
-        output += "#################   DATA   ###################\n"
+        f.write("#################   DATA   ###################\n")
 
-        loop_elements = [
-            [ l for l in range(i)] 
-            for i in self._source.axes.axes_len]
+        data = np.asarray(self._source.returnAsNumpy())
+        data = data.reshape(int(np.prod(self._source.axes.axes_len)), -1)
+        chunk_lines = max(1, chunk_values // max(data.shape[1], 1))
 
-        for e in itertools.product(*loop_elements):
-            data_ptr = self._source[e]
-            temp_list = data_ptr.flatten().tolist()
-            output += self._listToString(temp_list)+ "\n"
-        return output
+        for start in range(0, data.shape[0], chunk_lines):
+            np.savetxt(
+                f, data[start:start + chunk_lines], 
+                fmt = self._float_format, delimiter = ',')
 
-    def _writeTxtFile(self, metadata_string, axis_string, subaxis_string, data_string):
+    def _saveToHdf5(self):
         '''
-        Finally write the file
+        Save the dataset to a binary file. This is 
+        hdf5 if h5py is available and an npz archive
+        otherwise. The payload is written in one 
+        block with the axes, the subaxes and the 
+        columns of the metadata next to it. The 
+        metadata rows are stored in the order of the
+        payload so that the loader can link them to
+        the objects without creating them.
         '''
-        text_file = open(self._path+".txt", "w")
+        source  = self._source
+        dim     = source.axes.dim
+        arrays  = {'data' : np.asarray(source.returnAsNumpy())}
+        header  = {
+            'dim'       : dim,
+            'names'     : [None if e is None else str(e) for e in source.axes.names],
+            'units'     : [None if e is None else str(e) for e in source.axes.units],
+            'subaxes'   : 0,
+            'axis_types'    : [],
+            'subaxis_types' : [],
+            'meta_names': [],
+            'meta_types': [],
+            'meta_units': []}
+
+        for i in range(dim):
+            arrays['axis_' + str(i)], axis_type = self._axisArray(
+                source.axes.axes[i])
+            header['axis_types'].append(axis_type)
 
-        text_file.write(metadata_string)
-        text_file.write(axis_string)
-        text_file.write(subaxis_string)   
-        text_file.write(data_string)     
+        subaxes = self._subaxes()
+        header['subaxes'] = len(subaxes)
+        for i, subaxis in enumerate(subaxes):
+            arrays['subaxis_' + str(i)], axis_type = self._axisArray(subaxis)
+            header['subaxis_types'].append(axis_type)
 
-        text_file.close()
+        table = source.meta_table
+        if len(table) > 0:
+            by_id = np.full(source.id, -1, dtype = 'int64')
+            by_id[np.asarray(source.data_addresses, dtype = 'int64')] = source.get_meta_rows()
+            rows = np.where(source.map >= 0, by_id[source.map], -1).ravel()
+            if (rows >= 0).all():
+                table = table.take(rows)
+                for i, name in enumerate(table.names):
+                    values = table.columns[name][:table.rows]
+                    if values.dtype == object:
+                        values = values.astype(str)
+                    arrays['meta_' + str(i)] = values
+                    arrays['meta_present_' + str(i)] = table.present[name][:table.rows]
+                    header['meta_names'].append(name)
+                    header['meta_types'].append(table.types[name])
+                    header['meta_units'].append(table.units[name])
+            else:
+                print("Metadata is only saved if every object has a row")
 
-    def _saveToHdf5(self):
+        write_arrays(binary_path(self._path), arrays, header, dim = dim)
+
+    def _axisArray(self, axis):
         '''
-        Save the dataset to text ...
+        Convert an axis to an array for the binary 
+        file. Axes that are not numeric are stored as
+        strings.
+        Input: 
+        - axis (list)
+        Output: 
+        - the array and the type of the axis, one of
+          'int', 'float' and 'str'
         '''
+        array = np.asarray(axis)
+        if array.dtype.kind in 'biu':
+            return array.astype('int64'), 'int'
+        elif array.dtype.kind == 'f':
+            return array.astype('float64'), 'float'
+        return array.astype('U'), 'str'
 
     def _listToString(self,list_item):
         '''
@@ -170,9 +276,4 @@ class IODataSave:
         Input: 
         - list_item ([ints, float, str])
         '''
-        output = ""
-
-        for item in list_item:
-            output += str(item) + ","
-
-        return output[:len(output) - 1]
+        return ",".join(str(item) for item in list_item)
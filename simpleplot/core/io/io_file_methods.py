@@ -24,43 +24,149 @@
 
 import sys
 import os
+import re
 import glob
+import functools
+
+#the listings of the scanned directories by path
+_directory_index = {}
+
+#numbers in file names, the rest is literal text
+NUMBER_TOKEN = re.compile(r'(\d+(?:\.\d+)?)')
 
 def get_files_in_folder(path, extension = None):
     '''
     Whatever path is set as folder the machinery
     checks first that this path is valid and then
     goes through the folder and sends back a 
-    list of absolute paths. 
+    list of absolute paths. The listing is kept 
+    in an index with the modification time of the
+    folder and is only globbed again once the 
+    folder changed.
     '''
     path = os.path.normpath(path)
 
-    if os.path.isdir(path):
+    if not os.path.isdir(path):
+        return False
+
+    key = (path, extension)
+    mtime = os.stat(path).st_mtime_ns
+    if not key in _directory_index or not _directory_index[key][0] == mtime:
         if extension == None:
-            return glob.glob(path+'/')
+            files = glob.glob(path+'/')
         else:
-            return glob.glob(path+'/*'+extension)
-    else:
-        return False
+            files = glob.glob(path+'/*'+extension)
+        _directory_index[key] = [mtime, files]
+
+    return list(_directory_index[key][1])
 
 def get_common_substrings(path_list):
     '''
-    Whatever path is set as folder the machinery
-    checks first that this path is valid and then
-    goes through the folder and sends back a 
-    list of absolute paths. 
+    Return the substrings common to all the file 
+    names in their order, these separate the parts
+    that change from file to file. The names are 
+    split into number and text tokens and the runs
+    of tokens that are equal in all names are the 
+    common substrings. Text tokens that change 
+    keep their common prefix and suffix. If the 
+    names do not share the same token layout the
+    character search is used instead. The text 
+    after the last changing part is not returned.
+    The result is cached for the list of names.
+    '''
+    return list(_common_substrings(tuple(
+        element.split(os.path.sep)[-1]
+        for element in path_list)))
+
+@functools.lru_cache(maxsize = 32)
+def _common_substrings(names):
+    '''
+    The cached decomposition of the names.
+    Input: 
+    - names (str tuple) the file names
+    '''
+    tokens = [NUMBER_TOKEN.split(name) for name in names]
+    if not all(len(element) == len(tokens[0]) for element in tokens):
+        return tuple(_search_common_substrings(list(names)))
+
+    constant = [len(set(column)) == 1 for column in zip(*tokens)]
+
+    substrings  = []
+    temp_result = ''
+    for i, (column, fixed) in enumerate(zip(zip(*tokens), constant)):
+        if fixed:
+            temp_result += column[0]
+            continue
+
+        prefix, suffix = '', ''
+        if i % 2 == 0:
+            prefix, suffix = _common_affixes(column)
+        temp_result += prefix
+        if not temp_result == '':
+            substrings.append(temp_result)
+        temp_result = suffix
+
+    return tuple(substrings)
+
+def _common_affixes(strings):
+    '''
+    The common prefix and suffix of strings that 
+    differ, the suffix does not overlap the prefix.
+    Input: 
+    - strings (str tuple)
+    '''
+    prefix = os.path.commonprefix(list(strings))
+    suffix = os.path.commonprefix([element[::-1] for element in strings])[::-1]
+    length = min(len(element) for element in strings) - len(prefix)
+    return prefix, suffix[len(suffix) - max(0, min(len(suffix), length)):]
+
+def get_variable_parts(name, substrings, end = None):
+    '''
+    Split a file name at the common substrings and
+    return the parts that change in their order. 
+    Each substring is searched after the previous 
+    one so that short separators like '_' do not 
+    match the same part twice. The part after the 
+    last substring runs up to end and is left out
+    if end is None.
+    Input: 
+    - name (str) the file name
+    - substrings (str list) the common substrings
+    - end (str) the text closing the last part
+    Output: 
+    - the parts (str list)
+    '''
+    match = _parts_pattern(tuple(substrings), end).search(name)
+    if match is None:
+        raise ValueError(
+            "The name "+str(name)+" does not contain the common substrings")
+    return list(match.groups())
+
+@functools.lru_cache(maxsize = 32)
+def _parts_pattern(substrings, end):
+    '''
+    The cached pattern of the common substrings 
+    with a group between each of them.
+    '''
+    pattern = '(.*?)'.join(re.escape(element) for element in substrings)
+    if not end is None:
+        pattern += '(.*?)' + re.escape(end)
+    return re.compile(pattern)
+
+def _search_common_substrings(path_list):
+    '''
+    Slide a growing window over the first name and
+    keep the longest windows of at least three 
+    characters that are contained in all names.
     '''
     base_length = 3
     position    = 0
     substrings  = []
     run         = True
-    path_list   = [
-        element.split(os.path.sep)[-1]
-        for element in path_list]
 
     temp_result = ''
     while run:
-        if position + base_length == len(path_list[0]):
+        if position + base_length >= len(path_list[0]):
             run = False
             return substrings
 
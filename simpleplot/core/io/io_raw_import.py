@@ -23,10 +23,24 @@
 
 from ..io import io_file_methods as file_methods 
 
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 import os
 import datetime
 import numpy as np
 
+def read_raw_file(path):
+    '''
+    Read the two first columns of a raw text file
+    in one bulk conversion. This lives at module 
+    level so that it can be sent to processes.
+    Input: 
+    - path (str)
+    Output: 
+    - x, y (ndarray)
+    '''
+    data = np.loadtxt(path, usecols = (0, 1), ndmin = 2)
+    return data[:, 0], data[:, 1]
+
 class IORawHandler:
     '''
     This class will be initialized and then kept
@@ -130,9 +144,6 @@ class IORawHandler:
         except: 
             pass
 
-        self.dimension_list = self._process_dimensions(
-            self.common_str, 
-            previous = self.dimension_list )
         try:
             self.dimension_list = self._process_dimensions(
                 self.common_str, 
@@ -183,7 +194,9 @@ class IORawHandler:
             else:
                 #put the var
                 text += "<span style='font-size:12pt; font-weight:600; color:#000000;'>"
-                text += self.file_list[0].split(element)[1].split(common_str_fix[i+1])[0]
+                text += file_methods.get_variable_parts(
+                    os.path.basename(self.file_list[0]), 
+                    self.common_str, '.txt')[i]
                 text += "</span>"
 
         text += "<span style='font-size:12pt; font-weight:600; color:#000000;'>"
@@ -200,14 +213,21 @@ class IORawHandler:
         '''
         dimension_list = []
 
+        if len(common_strings) == 0:
+            return dimension_list
+        end = None if '.' in common_strings[-1] else '.txt'
+
+        #the changing parts of each file in their order
+        parts = [
+            file_methods.get_variable_parts(
+                os.path.basename(item), common_strings, end)
+            for item in self.file_list]
+
         for i in range(len(common_strings)):
             pre_split = common_strings[i]
 
             if i + 1 == len(common_strings):
-                if '.' in common_strings[i]:
-                    post_split = None
-                else:
-                    post_split = '.txt'
+                post_split = end
             else:
                 post_split = common_strings[i + 1]
 
@@ -221,8 +241,8 @@ class IORawHandler:
                     unit = '-'
 
                 values = []
-                for item in self.file_list:
-                    values.append(item.split(pre_split)[1].split(post_split)[0])
+                for item in parts:
+                    values.append(item[i])
                     try: 
                         values[-1] = float(values[-1])
                     except:
@@ -255,23 +275,19 @@ class IORawHandler:
         input being a list of strings that are
         common to all files...
         '''
-        path = self.file_list[index]
-        x = []
-        y = []
+        return read_raw_file(self.file_list[index])
 
-        with open(path) as f:
-            for element in f.readlines():
-                line        = element.strip('\n')
-                line_float  = list(map(float, line.split()))
-                x.append(line_float[0])
-                y.append(line_float[1])
-
-        return x,y
-
-    def process_import(self, target_data_structure):
+    def process_import(self, target_data_structure, progress = None, cancelled = None):
         '''
         This function will grab all the elements and 
         actually process the import sequence.
+        Input: 
+        - target_data_structure (DataStructure)
+        - progress (method) called with the percentage 
+          and a message after each file
+        - cancelled (method) stops the import if True
+        Output: 
+        - False if the import was cancelled
         '''
         dimension_list = []
         for  element in self.dimension_list:
@@ -285,7 +301,8 @@ class IORawHandler:
             dimension_list, 
             self.save_file_path)
 
-        self.worker.run(target_data_structure)
+        return self.worker.run(
+            target_data_structure, progress = progress, cancelled = cancelled)
 
 class IORawWorker:
     '''
@@ -295,19 +312,38 @@ class IORawWorker:
     Input: 
     - parent manager structure
     '''
-    def __init__(self, file_list, dimension_list, path):
+    def __init__(self, file_list, dimension_list, path, workers = None, processes = False):
         '''
         The init will manage all the initial setup
         before being sent out as a thread
+        Input: 
+        - file_list (str list)
+        - dimension_list (list) from the handler
+        - path (str) the save path
+        - workers (int) size of the pool
+        - processes (bool) parse in processes instead
+          of threads
         '''
         self.file_list      = file_list
         self.dimension_list = dimension_list
         self.state          = ''
         self.progress       = ''
         self.path           = path
+        self.workers        = workers
+        self.processes      = processes
 
-    def run(self, data_structure):
+    def run(self, data_structure, progress = None, cancelled = None):
         '''
+        Read all the files in a pool and fill the 
+        data structure. Nothing is added to the 
+        structure if the import is cancelled.
+        Input: 
+        - data_structure (DataStructure)
+        - progress (method) called with the percentage 
+          and a message after each file
+        - cancelled (method) stops the import if True
+        Output: 
+        - False if the import was cancelled
         '''
         #built a dimension array
         future_axes_values = [element[6] for element in self.dimension_list]
@@ -315,34 +351,18 @@ class IORawWorker:
         future_axes_units  = [element[1] for element in self.dimension_list]
 
         #scan files and create position array
-        future_axes_pos    = []
-
-        for path in self.file_list:
-            try:
-                future_axes_pos.append(
-                    [element[6].index(
-                        float(path.split(element[2])[1].split(element[3])[0]) )
-                    for element in self.dimension_list]
-                )
-
-            except:
-                future_axes_pos.append(
-                    [element[6].index(
-                        path.split(element[2])[1].split(element[3])[0]) 
-                    for element in self.dimension_list]
-                )
+        future_axes_pos    = self._positions()
 
         #read all files and create the data array
-        future_data_array = []
-
-        for path in self.file_list:
-            future_data_array.append([*self._reader(path)])
+        future_data_array  = self._read(progress, cancelled)
+        if future_data_array is None:
+            return False
 
         for i in range(len(self.file_list)):
             data_structure.addDataObject(
-                np.asarray(future_data_array[i][1]),
+                future_data_array[i][1],
                 future_axes_pos[i],
-                np.asarray(future_data_array[i][0]))
+                future_data_array[i][0])
 
         data_structure.validate()
 
@@ -353,6 +373,7 @@ class IORawWorker:
 
         data_structure.axes.collapseAllAxes(data_structure)
         print(data_structure)
+        return True
 
         #send it all out to the writer
         # axis_string = self._axisWriter(
@@ -378,30 +399,71 @@ class IORawWorker:
         # text_file.close()
         
         
-    def _reader(self, path):
+    def _positions(self):
         '''
-        This method will generate a string with the 
-        input being a list of strings that are
-        common to all files...
+        Find the position of each file on the axes. The
+        values of each file were extracted by the 
+        handler and are looked up in a dictionary of 
+        the first index of each value on the axis.
         '''
-        #set up
-        x = []
-        y = []
+        lookups = []
+        for element in self.dimension_list:
+            lookup = {}
+            for i, value in enumerate(element[6]):
+                lookup.setdefault(value, i)
+            lookups.append(lookup)
 
-        #open the file
-        with open(path) as f:
-
-            for element in f.readlines():
+        positions = []
+        for i in range(len(self.file_list)):
+            positions.append([
+                lookup[element[5][i]] 
+                for element, lookup in zip(self.dimension_list, lookups)])
 
-                line        = element.strip('\n')
-                line_float  = list(map(float, line.split()))
+        return positions
 
-                x.append(line_float[0])
-                y.append(line_float[1])
+    def _read(self, progress = None, cancelled = None):
+        '''
+        Parse the files in a thread or process pool. 
+        The results are collected in the order of the
+        file list.
+        Input: 
+        - progress (method) 
+        - cancelled (method)
+        Output: 
+        - list of [x, y] or None if cancelled
+        '''
+        pool = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        workers = self.workers if not self.workers is None else os.cpu_count()
+        output = []
+
+        executor = None
+        if workers is None or workers > 1:
+            executor = pool(max_workers = workers)
+            if self.processes:
+                #the files are sent to the processes in chunks
+                results = executor.map(
+                    read_raw_file, self.file_list, 
+                    chunksize = max(1, len(self.file_list) // (4 * (workers or 1))))
+            else:
+                #threads do not pickle, chunks would not help
+                results = executor.map(read_raw_file, self.file_list)
+        else:
+            results = map(read_raw_file, self.file_list)
 
-        return x,y
-            
+        try:
+            for path, result in zip(self.file_list, results):
+                if not cancelled is None and cancelled():
+                    return None
+                output.append(result)
+                if not progress is None:
+                    progress(
+                        int(100 * len(output) / len(self.file_list)),
+                        os.path.basename(path))
+        finally:
+            if not executor is None:
+                executor.shutdown(wait = False, cancel_futures = True)
 
+        return output
 
     def _metaWriter(self):
         '''
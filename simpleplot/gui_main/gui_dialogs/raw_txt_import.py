@@ -40,6 +40,8 @@ class RawTxtImport(QtWidgets.QDialog):
         self.io_handler.init_raw_import()
 
         self._target_data_structure = target_data_structure
+        self._importing = False
+        self._cancel_import = False
 
         self.setUpUi()
         self.connectMethods()
@@ -708,10 +710,37 @@ class RawTxtImport(QtWidgets.QDialog):
 
     def _process_export(self):
         '''
-        This method will handle the add item routine
+        This method will handle the add item routine.
+        While the import runs the process button 
+        cancels it.
         '''
+        if self._importing:
+            self._cancel_import = True
+            return
+
+        self._importing = True
+        self._cancel_import = False
+        self.dialog_button_process.setText("Cancel")
+        self.dialog_progressbar.setValue(0)
+
         self.io_handler.save_file_path = self.io_input_out.text()
-        self.io_handler.process_import(self._target_data_structure)
+        done = self.io_handler.process_import(
+            self._target_data_structure, 
+            progress = self._reportProgress,
+            cancelled = lambda: self._cancel_import)
+
+        self._importing = False
+        self.dialog_button_process.setText("Process")
+        self.dialog_label_progess.setText("Done" if done else "Cancelled")
+
+    def _reportProgress(self, percentage, message):
+        '''
+        Show the progress of the import and keep the 
+        dialog responsive so that it can be cancelled.
+        '''
+        self.dialog_progressbar.setValue(percentage)
+        self.dialog_label_progess.setText(message)
+        QtWidgets.QApplication.processEvents()
 
     def _build_list_dimensions(self):
         '''
@@ -333,6 +333,9 @@ class FitWidget(QtWidgets.QWidget):
         self.fit_bar_progress.setProperty("value", 24)
         self.fit_bar_progress.setObjectName("fit_bar_progress")
         self.horizontalLayout_4.addWidget(self.fit_bar_progress)
+        self.fit_check_joint = QtWidgets.QCheckBox(self.tabWidgetPage1)
+        self.fit_check_joint.setObjectName("fit_check_joint")
+        self.horizontalLayout_4.addWidget(self.fit_check_joint)
         self.verticalLayout_4.addLayout(self.horizontalLayout_4)
         self.horizontalLayout_3 = QtWidgets.QHBoxLayout()
         self.horizontalLayout_3.setObjectName("horizontalLayout_3")
@@ -352,6 +355,9 @@ class FitWidget(QtWidgets.QWidget):
         self.pushButton_12 = QtWidgets.QPushButton(self.tabWidgetPage1)
         self.pushButton_12.setObjectName("pushButton_12")
         self.horizontalLayout_3.addWidget(self.pushButton_12)
+        self.fit_button_batch = QtWidgets.QPushButton(self.tabWidgetPage1)
+        self.fit_button_batch.setObjectName("fit_button_batch")
+        self.horizontalLayout_3.addWidget(self.fit_button_batch)
         self.verticalLayout_4.addLayout(self.horizontalLayout_3)
         self.tabWidget1.addTab(self.tabWidgetPage1, "")
         self.tabWidgetPage2 = QtWidgets.QWidget()
@@ -406,6 +412,8 @@ class FitWidget(QtWidgets.QWidget):
         self.fit_button_fit.setText(_translate("self.", "Fit"))
         self.pushButton_11.setText(_translate("self.", "Copy >"))
         self.pushButton_12.setText(_translate("self.", "Fit >"))
+        self.fit_button_batch.setText(_translate("self.", "Fit all"))
+        self.fit_check_joint.setText(_translate("self.", "Joint fit"))
         self.tabWidget1.setTabText(self.tabWidget1.indexOf(self.tabWidgetPage1), _translate("self.", "Fit Functions"))
         self.pushButton_13.setText(_translate("self.", "Set"))
         self.tabWidget1.setTabText(self.tabWidget1.indexOf(self.tabWidgetPage2), _translate("self.", "Function Bounds"))
@@ -419,8 +427,11 @@ class FitWidget(QtWidgets.QWidget):
         Connec the methods to their outs
         '''
         self.fit_button_fit.clicked.connect(self.setFit)
+        self.fit_button_batch.clicked.connect(self.setBatchFit)
+        self.fit_check_joint.toggled.connect(self.setJointFit)
         self._handler.progress_int.connect(self.setProgress)
         self._handler.progress_finished.connect(self._refreshPlots)
+        self._handler.batch_fitter.finished.connect(self._resetBatchFit)
 
         self._function_selection_set.clicked.connect(self._buildFitSetup)
         self._function_selection_project.currentTextChanged.connect(self._populatePlots)
@@ -450,6 +461,35 @@ class FitWidget(QtWidgets.QWidget):
         '''
         self._handler.performFit()
 
+    def setJointFit(self, joint):
+        '''
+        Fit all the free parameters at once instead 
+        of one after the other
+        '''
+        self._handler.setFitMode('joint' if joint else 'sequential')
+
+    def setBatchFit(self):
+        '''
+        Fit all the rays in the background or cancel
+        the batch fit if it is running
+        '''
+        if self._handler.batch_thread.isRunning():
+            self._handler.cancelBatchFit()
+            self.fit_button_batch.setText("Cancelling")
+            self.fit_button_batch.setEnabled(False)
+            return
+
+        self.fit_button_batch.setText("Cancel")
+        self._handler.performBatchFit()
+
+    def _resetBatchFit(self):
+        '''
+        Restore the batch button once the batch fit 
+        is over
+        '''
+        self.fit_button_batch.setText("Fit all")
+        self.fit_button_batch.setEnabled(True)
+
     def setProgress(self, value):
         self.fit_bar_progress.setValue(value)
 
@@ -225,7 +225,7 @@ class DataWidget(QtWidgets.QWidget):
         The user clicked the row header item
         ''' 
         path = QtWidgets.QFileDialog.getOpenFileName(
-            parent = self, filter = "Text (*.txt);;Hdf5 (*.h5)")
+            parent = self, filter = "Text (*.txt);;Hdf5 (*.h5);;Numpy archive (*.npz)")
         
         if not path[0] == "":
             self._data_pointer.reset()
@@ -138,6 +138,13 @@ class DatasetsNode(SessionNode):
     def addDataProcHDF(self):
         '''
         '''
+        path = QtWidgets.QFileDialog.getOpenFileName(
+            parent = self, filter = "Hdf5 (*.h5);;Numpy archive (*.npz)")
+        
+        if not path[0] == "":
+            data_item = self.addDataItem()
+            loader = IODataLoad(data_item.data_item, path[0])
+            loader.load(path[1].split("(*.")[1].split(")")[0])
 
     def contextMenuRequested(self, parent = None):
         """
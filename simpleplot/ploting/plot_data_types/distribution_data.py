@@ -58,7 +58,7 @@ class DistributionData(PlotData, SessionNode):
         for i,value in enumerate(self._axes):
             if value in kwargs.keys():
                 if isinstance(kwargs[value],np.ndarray) or isinstance(kwargs[value],list):
-                    elements[i] = np.array(kwargs[value]).astype(np.float)
+                    elements[i] = self._asArray(kwargs[value])
                     changed[self._axes.index(value)] = True
 
         if elements[self._axes.index('data')] is None:
@@ -23,13 +23,69 @@
 
 import numpy as np
 
+#the dtypes floating input can be kept in
+FLOAT_TYPES = [np.dtype('float16'), np.dtype('float32'), np.dtype('float64')]
+
+def setDefaultDtype(dtype = None):
+    '''
+    Set the dtype policy of all the plot data items
+    that do not define their own. None keeps the 
+    floating point input as it is and converts the
+    rest to float64.
+    Input: 
+    - dtype (None, str or numpy dtype)
+    '''
+    PlotData.default_dtype = None if dtype is None else np.dtype(dtype)
+
 class PlotData: 
     '''
     This will be the main data class purposed
     to be inherited by variations with different
     variations.
     '''
+    default_dtype = None
+
     def __init__(self,**kwargs):
-        pass
+        self._dtype = (
+            np.dtype(kwargs['dtype']) 
+            if not kwargs.get('dtype', None) is None else None)
+
+    def setDtype(self, dtype = None):
+        '''
+        Set the dtype policy of this item. None falls
+        back onto the global policy. The policy is 
+        applied on the next setData.
+        Input: 
+        - dtype (None, str or numpy dtype)
+        '''
+        self._dtype = None if dtype is None else np.dtype(dtype)
+
+    def getDtype(self):
+        '''
+        Return the dtype policy in use, None meaning
+        that floating point input is kept as is.
+        '''
+        return self._dtype if not self._dtype is None else PlotData.default_dtype
+
+    def _asArray(self, value):
+        '''
+        Convert the input to an array following the 
+        dtype policy. Arrays that already have the 
+        right dtype and own their memory are not 
+        copied, so the item shares them with the 
+        caller. Views, such as the slices of the 
+        dense buffer of a DataStructure, are copied 
+        since the buffer is edited in place without 
+        telling the item.
+        Input: 
+        - value (ndarray or list)
+        '''
+        dtype = self.getDtype()
+        value = np.asarray(value)
+        if dtype is None:
+            dtype = value.dtype if value.dtype in FLOAT_TYPES else np.dtype('float64')
+        if value.dtype == dtype and not value.flags.owndata:
+            return np.array(value)
+        return value.astype(dtype, copy = False)
 
     
\ No newline at end of file
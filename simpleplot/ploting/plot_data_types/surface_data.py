@@ -55,7 +55,7 @@ class SurfaceData(PlotData, SessionNode):
         for i,value in enumerate(self._axes):
             if value in kwargs.keys():
                 if isinstance(kwargs[value],np.ndarray) or isinstance(kwargs[value],list):
-                    elements[i] = np.array(kwargs[value]).astype(np.float)
+                    elements[i] = self._asArray(kwargs[value])
                     changed[self._axes.index(value)] = True
 
         if elements[self._axes.index('z')] is None:
@@ -199,9 +199,9 @@ class SurfaceData(PlotData, SessionNode):
         offset      = np.amin(self._data[2])
         for i in range(len(axis)):
             axis[i] = i*factor + offset
-            elements[i] = np.argwhere(
+            elements[i] = np.count_nonzero(
                 (self._data[2] > i*factor + offset)
-                & (self._data[2] < (i+1)*factor + offset)).shape[0]
+                & (self._data[2] < (i+1)*factor + offset))
             
         self._histogram = [
             [self._data[0], np.sum(self._data[2],axis = 0)],
@@ -214,7 +214,7 @@ class SurfaceData(PlotData, SessionNode):
         '''
         self._bounds = []
         for element in self._data:
-            self._bounds.append([np.amin(element.astype(np.float)), np.amax(element.astype(np.float))])
+            self._bounds.append([np.amin(element), np.amax(element)])
 
     def _buildVerticeMap(self):
         '''
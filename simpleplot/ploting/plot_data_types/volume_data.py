@@ -58,7 +58,7 @@ class VolumeData(PlotData, SessionNode):
         for i,value in enumerate(self._axes):
             if value in kwargs.keys():
                 if isinstance(kwargs[value],np.ndarray) or isinstance(kwargs[value],list):
-                    elements[i] = np.array(kwargs[value]).astype(np.float)
+                    elements[i] = self._asArray(kwargs[value])
                     changed[self._axes.index(value)] = True
 
         if elements[self._axes.index('data')] is None:
@@ -91,7 +91,7 @@ class VolumeData(PlotData, SessionNode):
 
         if self._sanity(elements):
             self._level = None
-            norm_data = np.array(elements[3]) - np.amin(elements[3])
+            norm_data = elements[3] - np.amin(elements[3])
             if not np.amax(norm_data) == 0:
                 norm_data /= np.amax(norm_data)
             self._data = elements + [norm_data]
@@ -194,9 +194,9 @@ class VolumeData(PlotData, SessionNode):
         offset      = np.amin(self._data[3])
         for i in range(len(axis)):
             axis[i] = i*factor + offset
-            elements[i] = np.argwhere(
+            elements[i] = np.count_nonzero(
                 (self._data[3] > i*factor + offset)
-                & (self._data[3] < (i+1)*factor + offset)).shape[0]
+                & (self._data[3] < (i+1)*factor + offset))
             
         self._histogram = [
             [self._data[0], np.sum(self._data[3],axis = (1,2))],
@@ -197,7 +197,7 @@ class VolumePlot(ParameterHandler):
                 else:
                     data_limits[j] = [0, data[j].shape[0]]
 
-            colors_temp = np.zeros(colors.shape)
+            colors_temp = np.zeros(colors.shape, dtype = colors.dtype)
             colors_temp[
                 data_limits[0][0]:data_limits[0][1],
                 data_limits[1][0]:data_limits[1][1],
@@ -207,7 +207,7 @@ class VolumePlot(ParameterHandler):
                 data_limits[2][0]:data_limits[2][1]]
             colors = colors_temp
 
-            colors_temp = np.zeros(colors.shape)
+            colors_temp = np.zeros(colors.shape, dtype = colors.dtype)
             for j,target in enumerate(targets):
                 data_range = self[target]
                 if data_range[3] and not data_range[4] == '':
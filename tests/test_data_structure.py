@@ -0,0 +1,338 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import copy
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from simpleplot.core.data import data_structure
+from simpleplot.core.data.data_structure import DataStructure
+from simpleplot.core.data.slice_cache import SliceCache
+
+def build(rows = 6, columns = 4, points = 50, dense = False):
+    '''
+    A validated structure where each object holds
+    its row index plus its column index / 10.
+    '''
+    data = DataStructure()
+    if dense:
+        data.setDenseStorage(True)
+    for i in range(rows):
+        for j in range(columns):
+            data.addDataObject(np.zeros(points) + i + j / 10., [i, j])
+    data.validate()
+    return data
+
+def test_slice_cache_evicts_least_recently_used():
+    cache = SliceCache(max_bytes = 100)
+    cache.add(('a',), 'a', size = 40)
+    cache.add(('b',), 'b', size = 40)
+    cache.get(('a',))
+    cache.add(('c',), 'c', size = 40)
+    assert ('a',) in cache and ('c',) in cache
+    assert not ('b',) in cache
+    assert cache.current_bytes == 80
+
+def test_slice_cache_resize_accounts_and_evicts():
+    cache = SliceCache(max_bytes = 100)
+    cache.add(('a',), 'a', size = 10)
+    cache.add(('b',), 'b', size = 10)
+    cache.resize(('b',), 95)
+    assert cache.current_bytes == 95
+    assert not ('a',) in cache
+
+    cache.resize(('b',), 200)
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
+
+def test_slice_is_a_view_of_the_parent():
+    data = build()
+    view = data.get_slice([2])
+    assert view is data.get_slice([2, '-'])
+    assert np.allclose(view.returnAsNumpy()[:, 0], [2., 2.1, 2.2, 2.3])
+    assert np.array_equal(view.ids(), data.map[2])
+
+def test_materialised_view_is_accounted_in_the_cache():
+    data = build()
+    view = data.get_slice(['-', 1])
+    before = data.slices.current_bytes
+    array = view.returnAsNumpy()
+    assert data.slices.current_bytes == before + array.nbytes
+
+def test_materialised_views_respect_the_budget():
+    data = build(rows = 10, columns = 10, points = 1000)
+    data.set_slice_budget(3 * 10 * 1000 * 8)
+    for i in range(10):
+        data.get_slice([i]).returnAsNumpy()
+    assert data.slices.current_bytes <= data.slices.max_bytes
+    assert len(data.slices) < 10
+
+def test_view_follows_changes_of_the_parent():
+    data = build(dense = True)
+    view = data.get_slice([3])
+    data.returnAsNumpy()[3, 1] = 7.
+    assert np.all(view.returnAsNumpy()[1] == 7.)
+
+def test_removal_drops_the_cached_slices():
+    data = build()
+    data.get_slice([1]).returnAsNumpy()
+    reduced = data.remove_from_axis(0, [1, 0, 1, 1, 1, 1])
+    assert reduced.axes.axes_len == [5, 4]
+    assert np.allclose(reduced.get_slice([2]).returnAsNumpy()[:, 0], [2., 2.1, 2.2, 2.3])
+
+def test_worker_reads_are_consistent_while_appending():
+    data = build(rows = 2, columns = 4, points = 20, dense = True)
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            try:
+                with data.lock:
+                    rows = data.axes.axes_len[0]
+                    array = data.returnSliceAsNumpy([slice(None), slice(None), slice(None)])
+                assert array.shape[0] == rows
+            except Exception as error:
+                errors.append(error)
+
+    thread = threading.Thread(target = read)
+    thread.start()
+    for i in range(2, 60):
+        for j in range(4):
+            data.append(np.zeros(20) + i + j / 10., [i, j])
+    stop.set()
+    thread.join()
+
+    assert errors == []
+    assert data.returnAsNumpy().shape == (60, 4, 20)
+
+@pytest.mark.parametrize('method', ['createMap', 'clean'])
+def test_replacing_the_map_waits_for_the_lock(method):
+    data = build()
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with data.lock:
+            held.set()
+            release.wait(5)
+
+    thread = threading.Thread(target = hold)
+    thread.start()
+    held.wait(5)
+    replacer = threading.Thread(target = getattr(data, method))
+    replacer.start()
+    replacer.join(0.2)
+    assert replacer.is_alive()
+    release.set()
+    replacer.join(5)
+    thread.join()
+    assert not replacer.is_alive()
+
+def test_copies_get_their_own_lock():
+    data = build()
+    copied = copy.deepcopy(data)
+    assert not copied.lock is data.lock
+    with copied.lock:
+        assert copied.returnSliceAsNumpy([1, 2, slice(None)])[0] == data.returnSliceAsNumpy([1, 2, slice(None)])[0]
+
+def append_rows(data, start, stop, columns = 4, points = 20):
+    for i in range(start, stop):
+        for j in range(columns):
+            data.append(np.zeros(points) + i + j / 10., [i, j])
+
+def test_out_of_core_storage_grows_on_disk(tmp_path):
+    data = build(rows = 2, columns = 4, points = 20)
+    data.setStoragePath(str(tmp_path / 'data.npy'))
+    append_rows(data, 2, 20)
+
+    assert isinstance(data.buffer, np.memmap)
+    assert np.allclose(data.returnAsNumpy()[:, 1, 0], np.arange(20) + 0.1)
+    data.flush()
+    stored = np.load(str(tmp_path / 'data.npy'))
+    assert np.allclose(stored[:20, 3, 0], np.arange(20) + 0.3)
+
+def test_out_of_core_storage_where_mapped_files_can_not_be_replaced(tmp_path, monkeypatch):
+    '''
+    Windows refuses to replace a file that is still
+    mapped, the maps then have to be released first.
+    '''
+    replace = os.replace
+    calls = []
+
+    def refuse_first(source, target):
+        calls.append(target)
+        if len(calls) % 2 == 1:
+            raise PermissionError(target)
+        replace(source, target)
+
+    data = build(rows = 2, columns = 4, points = 20)
+    monkeypatch.setattr(data_structure.os, 'replace', refuse_first)
+    data.setStoragePath(str(tmp_path / 'data.npy'))
+    append_rows(data, 2, 20)
+
+    assert len(calls) > 2
+    assert isinstance(data.buffer, np.memmap)
+    assert data.buffer.filename == str(tmp_path / 'data.npy')
+    assert np.allclose(data.returnAsNumpy()[:, 2, 0], np.arange(20) + 0.2)
+    assert np.allclose(data.DataObjects[5].data, data.returnAsNumpy()[1, 1])
+
+def test_dense_buffer_holds_the_objects():
+    data = build(dense = True)
+    array = data.returnAsNumpy()
+    assert array is data.buffer
+    assert array.shape == (6, 4, 50)
+    assert np.shares_memory(data.DataObjects[5].data, array)
+    assert np.allclose(array[1, 1], 1.1)
+
+def test_release_buffer_gives_the_objects_their_data_back():
+    data = build(dense = True)
+    data.releaseBuffer()
+    assert data.buffer is None
+    assert not np.shares_memory(data.DataObjects[5].data, data.returnAsNumpy())
+    assert np.allclose(data.returnAsNumpy()[1, 1], 1.1)
+
+def test_adopted_buffer_is_not_copied():
+    array = np.random.rand(3, 5, 7)
+    data = DataStructure()
+    data.adoptBuffer(array, 2)
+    assert data.returnAsNumpy() is array
+    assert data.axes.axes_len == [3, 5]
+    assert np.array_equal(data.returnSliceAsNumpy([1, slice(None), slice(0, 2)]), array[1, :, :2])
+
+def test_positions_follow_removed_objects():
+    data = build()
+    data.remove_data([0, 5, 6])
+    assert len(data.DataObjects) == 21
+    for address in [1, 7, 23]:
+        position = data.get_pos_from_id(address)
+        assert data.DataObjects[position].id == address
+    assert not 5 in data.data_positions
+
+def test_ids_for_index_slice_the_map():
+    data = build()
+    assert np.array_equal(data.axes.get_id_for_index([2, 3]), [data.map[2, 3]])
+    assert np.array_equal(data.axes.get_id_for_index(['-', 1]), data.map[:, 1])
+    assert np.array_equal(
+        data.axes.get_id_for_index([slice(1, 3)]), data.map[1:3].ravel())
+
+    removed = data.map[2, 3]
+    data.remove_data([removed])
+    data.axes.remove_from_axes([removed])
+    data.clean()
+    assert data.axes.get_id_for_index([2, 3]).size == 0
+    assert data.axes.get_id_for_index([2]).size == 3
+
+def test_append_grows_the_map_and_buffer_geometrically():
+    data = build(rows = 2, columns = 4, points = 20, dense = True)
+    regions = []
+    data.addListener(regions.append)
+
+    append_rows(data, 2, 3)
+    assert regions[0] is None
+    assert regions[1:] == [[2, 1], [2, 2], [2, 3]]
+    capacity = data._buffer_store.shape[0]
+    assert capacity == 4
+
+    append_rows(data, 3, 4)
+    assert data._buffer_store.shape[0] == capacity
+    assert data.axes.axes_len == [4, 4]
+    assert np.shares_memory(data.DataObjects[-1].data, data.buffer)
+    assert np.allclose(data.returnAsNumpy()[:, 2, 0], np.arange(4) + 0.2)
+    assert np.array_equal(data.map, np.arange(16).reshape(4, 4))
+
+def test_append_of_a_different_shape_releases_the_buffer():
+    data = build(rows = 2, columns = 2, points = 20, dense = True)
+    data.append(np.zeros(10), [0, 2])
+    assert data.buffer is None
+    assert data.DataObjects[-1].data.shape == (10,)
+
+def test_rebin_sums_and_averages_the_bins():
+    data = build(rows = 6, columns = 4, points = 5)
+    data.axes.names[0] = 'x'
+    data.axes.axes[0] = [0., 1., 2., 3., 4., 5.]
+
+    summed = data.rebin('x', 2)
+    assert summed.axes.axes_len == [3, 4]
+    assert summed.axes.axes[0] == [0.5, 2.5, 4.5]
+    assert np.allclose(summed.returnAsNumpy()[:, 1, 0], [1.2, 5.2, 9.2])
+
+    mean = data.rebin(0, [0, 1, 4], reducer = 'mean')
+    assert np.allclose(mean.returnAsNumpy()[:, 0, 0], [0., 2., 4.5])
+    assert mean.axes.axes[0] == [0., 2., 4.5]
+
+def test_rebin_rejects_bad_edges(capsys):
+    data = build()
+    assert data.rebin(0, [0, 3, 2]) is None
+    assert data.rebin(0, [0, 6]) is None
+    assert data.rebin(0, 2, reducer = 'max') is None
+    assert 'increasing' in capsys.readouterr().out
+
+def test_sum_in_order_adds_neighbouring_objects():
+    data = DataStructure()
+    for i in range(6):
+        data.addMetadataObject({'T': ['T', 'float', i, 'K']})
+        data.addDataObject(np.zeros(5) + i, [i // 2])
+    data.sum_in_order(increment = 2)
+
+    assert len(data.DataObjects) == 3
+    assert np.allclose(data.returnAsNumpy()[:, 0], [1., 5., 9.])
+    assert np.allclose(
+        data.meta_table.columns['T'][:len(data.meta_table)], [0.5, 2.5, 4.5])
+
+def test_collapsed_axes_rebuild_the_map_and_buffer():
+    data = DataStructure()
+    data.setDenseStorage(True)
+    for k in range(4):
+        data.addDataObject(np.zeros(5) + k, [k, k])
+    data.validate()
+    data.axes.axes[0] = [1., 1., 2., 2.]
+    data.axes.axes[1] = [5., 6., 5., 6.]
+    data.axes.collapseAllAxes(data)
+
+    assert data.axes.axes_len == [2, 2]
+    assert data.map.shape == (2, 2)
+    assert np.array_equal(np.sort(data.axes.get_id_for_index([1, '-'])), [2, 3])
+    assert np.allclose(data.returnSliceAsNumpy([1])[:, 0], [2., 3.])
+    assert np.allclose(data.get_slice(['-', 6.]).returnAsNumpy()[:, 0], [1., 3.])
+
+def test_appended_objects_keep_their_metadata_rows():
+    data = build(rows = 6, columns = 4, points = 5)
+    for k, element in enumerate(data.DataObjects):
+        data.addMetadataObject({'T' : ['T', 'float', k, 'K']})
+        element.meta_address.append(k)
+    binned = data.rebin(0, 2)
+    assert len(binned.meta_table) == 12
+
+    binned.addMetadataObject({'T' : ['T', 'float', 100., 'K']})
+    binned.addMetadataObject({'T' : ['T', 'float', 200., 'K']})
+    binned.append(np.zeros(5), [3, 0])
+
+    rows = binned.get_meta_rows()
+    assert rows[-1] == 13
+    assert np.array_equal(rows[:12], np.arange(12))
+    assert binned.meta_table.value(rows[-1], 'T') == 200.
@@ -0,0 +1,315 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import numpy as np
+import pytest
+from PyQt5 import QtWidgets
+
+from simpleplot.core.fit.fit_handler import FitHandler
+from simpleplot.core.fit.fit_worker import FitWorker
+
+X = np.linspace(0, 100, 500)
+
+def peak(position):
+    return 1. + 10 * 4 / ((X - position)**2 + 4)
+
+class Link:
+    '''
+    The data link of the handler, a peak that moves
+    with the ray.
+    '''
+    version = 0
+    errors = None
+
+    def getVariableAxes(self):
+        return [np.arange(4.), np.arange(3.)]
+
+    def getFitAxes(self):
+        return [X]
+
+    def getData(self, ray):
+        y = peak(self.position(ray))
+        if not self.errors is None:
+            y[:100] += 50.
+        return y
+
+    def getErrors(self, ray):
+        return self.errors
+
+    def position(self, ray):
+        return 20 + 10 * ray[0] + 3 * ray[1]
+
+@pytest.fixture(scope = 'module')
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+@pytest.fixture
+def handler(app):
+    return FitHandler(Link(), gui = True)
+
+def test_handler_defaults_to_the_sequential_fit(handler):
+    assert handler.fit_mode == 'sequential'
+
+def test_handler_fit_mode_is_opt_in(handler, capsys):
+    handler.setFitMode('joint')
+    assert handler.fit_mode == 'joint'
+    handler.setFitMode('other')
+    assert handler.fit_mode == 'joint'
+    assert "has to be" in capsys.readouterr().out
+
+def make(mode = 'sequential', positions = (30., 60.), repetition = 3):
+    '''
+    A fit worker of lorentzians on a baseline 
+    started off the true positions.
+    '''
+    worker = FitWorker()
+    y = 1. + 0. * X
+    for position in positions:
+        y += peak(position) - 1.
+    worker.setXY([X], y)
+    for position in positions:
+        worker.addFunction('Lorenzian')
+        worker.func_dict['Lorenzian'][2][-1].paras = [position + 0.5, 1.5, 8., 0.]
+    worker.addFunction('Baseline')
+    worker.setParameters([0,1,2,3], repetition)
+    worker.setMode(mode)
+    worker.fitter.functions = worker.func_dict
+    return worker
+
+def test_set_parameters_takes_order_and_repetition():
+    worker = make(repetition = 4)
+    assert worker.fitter.container == [[0,1,2,3], 4]
+
+def test_residue_is_a_weighted_vector():
+    worker = make()
+    fitter = worker.fitter
+    fitter.setErrors(np.full(X.shape, 0.5))
+    residual = fitter.residue(np.array([1.]), lambda p: 0. * X + p[0], X * 0. + 3., 0.)
+    assert residual.shape == X.shape
+    assert np.allclose(residual, 4.)
+
+def test_invalid_errors_do_not_contribute():
+    worker = make()
+    errors = np.ones(X.shape)
+    errors[:10] = 0.
+    errors[10:20] = np.nan
+    worker.fitter.setErrors(errors)
+    assert np.all(worker.fitter.weights[:20] == 0.)
+    assert np.all(worker.fitter.weights[20:] == 1.)
+
+def test_robust_loss_resists_outliers():
+    worker = make('joint')
+    worker.fitter.y = worker.fitter.y + np.where(np.arange(X.size) % 50 == 0, 30., 0.)
+    worker.setLoss('soft_l1', 0.1)
+    worker.fitter.fit()
+    assert abs(worker.func_dict['Lorenzian'][2][0].paras[0] - 30.) < 0.05
+
+def test_joint_fit_recovers_overlapping_peaks():
+    worker = make('joint', positions = (48., 52.))
+    worker.fitter.y = worker.fitter.y + np.random.default_rng(0).normal(0., 0.05, X.size)
+    covariance = worker.fitter.fitJoint()
+    lorentzians = worker.func_dict['Lorenzian'][2]
+    assert abs(lorentzians[0].paras[0] - 48.) < 0.1
+    assert abs(lorentzians[1].paras[0] - 52.) < 0.1
+
+    targets = worker.fitter.targets
+    assert covariance.shape == (len(targets), len(targets))
+    assert np.allclose(covariance, covariance.T)
+    for i, (element, n) in enumerate(targets):
+        assert element.para_err[n] == pytest.approx(np.sqrt(covariance[i, i]))
+        assert 0. < element.para_err[n] < 1.
+
+def test_joint_fit_skips_fixed_parameters():
+    worker = make('joint')
+    lorentzian = worker.func_dict['Lorenzian'][2][0]
+    lorentzian.para_fix[0] = True
+    worker.fitter.fit()
+    assert lorentzian.paras[0] == 30.5
+    assert not [lorentzian, 0] in worker.fitter.targets
+
+@pytest.mark.parametrize('key, paras', [
+    ('Lorenzian', [1., 0.7, 3., 0.4]),
+    ('Linear', [0.5, 1.3, 0.2]),
+    ('Sinus', [0.3, 1.7, 2., 0.5]),
+    ('Baseline', [0.8])])
+def test_jacobian_matches_finite_differences(key, paras):
+    worker = FitWorker()
+    x = np.linspace(-3, 5, 300)
+    worker.addFunction(key)
+    function = worker.func_dict[key][2][-1]
+    function.paras = list(paras)
+    assert function.hasJacobian()
+    jacobian = function.returnJacobian(x)
+
+    for n in range(len(paras)):
+        outputs = []
+        for step in [1e-6, -1e-6]:
+            function.paras = list(paras)
+            function.paras[n] += step
+            function.calculated = False
+            outputs.append(function.returnData(x))
+        function.paras = list(paras)
+        numeric = (outputs[0] - outputs[1]) / 2e-6
+        assert np.allclose(
+            np.broadcast_to(jacobian[n], x.shape), numeric, atol = 1e-6)
+
+def test_analytic_and_numeric_fits_agree():
+    results = []
+    calls = []
+    for use_jacobian in [True, False]:
+        worker = make('joint')
+        jacobian = worker.fitter.jointJacobian
+        worker.fitter.jointJacobian = lambda p: calls.append(use_jacobian) or jacobian(p)
+        worker.fitter.use_jacobian = use_jacobian
+        worker.fitter.fit()
+        results.append([
+            list(element.paras) for element in worker.func_dict['Lorenzian'][2]])
+    assert len(calls) > 0 and all(calls)
+    assert np.allclose(results[0], results[1], atol = 1e-5)
+
+def test_constructor_matches_the_sum_of_the_other_functions():
+    worker = make(positions = (30., 60.), repetition = 1)
+    fitter = worker.fitter
+    fitter.fit()
+    functions = [
+        (key, m, element) for key in fitter.functions.keys()
+        for m, element in enumerate(fitter.functions[key][2])]
+
+    for key, m, _ in functions:
+        expected = 0. * X
+        for other_key, other_m, element in functions:
+            if not (other_key, other_m) == (key, m):
+                element.calculated = False
+                expected = expected + element.returnData(X)
+        assert np.allclose(fitter.constructor(ignore = [key, m]), expected)
+
+def test_constructor_follows_changed_functions():
+    worker = make(repetition = 1)
+    fitter = worker.fitter
+    fitter.resetModel()
+    lorentzian = fitter.functions['Lorenzian'][2][1]
+    lorentzian.paras = [70., 2., 5., 0.]
+    fitter._changed.add(('Lorenzian', 1))
+
+    ignored = fitter.constructor(ignore = ['Lorenzian', 1])
+    total = fitter.constructor()
+    lorentzian.calculated = False
+    assert np.allclose(total - ignored, lorentzian.returnData(X))
+
+def start_rays(handler):
+    '''
+    Lorentzians on a baseline on every ray, started 
+    off the peak of the ray.
+    '''
+    rays = handler.rayCount()
+    handler.addFunction('Lorenzian', rays = rays)
+    handler.addFunction('Baseline', rays = rays)
+    for idx in range(rays):
+        position = handler._data_link.position(handler.getRay(idx))
+        handler.func_dict['Lorenzian'][2][0][idx].paras = [position + 1., 1.5, 8., 0.]
+
+def test_ray_index_round_trip(handler):
+    assert handler.rayCount() == 12
+    for idx in range(handler.rayCount()):
+        assert handler.getRayIdx(handler.getRay(idx)) == idx
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_fit_fits_every_ray(handler, workers):
+    start_rays(handler)
+    handler.batch_workers = workers
+    progress = []
+    handler.batch_fitter.progress_int.connect(progress.append)
+    handler.prepareBatchFit()
+    handler.batch_fitter.run()
+
+    assert progress[-1] == 100
+    for idx in range(handler.rayCount()):
+        position = handler._data_link.position(handler.getRay(idx))
+        assert abs(handler.func_dict['Lorenzian'][2][0][idx].paras[0] - position) < 1e-3
+        assert abs(handler.func_dict['Baseline'][2][0][idx].paras[0] - 1.) < 1e-3
+
+def test_batch_fit_can_be_cancelled(handler):
+    start_rays(handler)
+    handler.batch_workers = 2
+    handler.batch_fitter.chunk = 1
+    chunks = []
+    handler.batch_fitter.result.connect(lambda output: chunks.append(output))
+    handler.batch_fitter.result.connect(lambda output: handler.cancelBatchFit())
+    handler.prepareBatchFit()
+    handler.batch_fitter.run()
+
+    assert 0 < len(chunks) < handler.rayCount()
+    fitted = [output[0][0] for output in chunks]
+    for idx in range(handler.rayCount()):
+        if not idx in fitted:
+            position = handler._data_link.position(handler.getRay(idx))
+            assert handler.func_dict['Lorenzian'][2][0][idx].paras[0] == position + 1.
+
+def corrupted_errors():
+    '''
+    The error bars of the Link, the points it 
+    corrupts have none.
+    '''
+    errors = np.ones(X.shape)
+    errors[:100] = np.inf
+    return errors
+
+def test_handler_passes_the_error_bars(handler):
+    handler._data_link.errors = corrupted_errors()
+    handler.prepareFit()
+    weights = handler.fit_worker.fitter.weights
+    assert np.all(weights[:100] == 0.)
+    assert np.all(weights[100:] == 1.)
+
+def test_batch_fit_uses_the_error_bars(handler):
+    handler._data_link.errors = corrupted_errors()
+    start_rays(handler)
+    handler.batch_workers = 1
+    handler.prepareBatchFit()
+    handler.batch_fitter.run()
+
+    for idx in range(handler.rayCount()):
+        position = handler._data_link.position(handler.getRay(idx))
+        assert abs(handler.func_dict['Lorenzian'][2][0][idx].paras[0] - position) < 1e-3
+        assert abs(handler.func_dict['Baseline'][2][0][idx].paras[0] - 1.) < 1e-3
+
+def test_running_total_is_summed_again():
+    worker = make(repetition = 1)
+    fitter = worker.fitter
+    fitter.resetModel()
+    fitter.resum = 4
+    lorentzian = fitter.functions['Lorenzian'][2][1]
+
+    for step in range(8):
+        lorentzian.paras = [60. + step, 2., 1e-8 if step % 2 else 1e8, 0.]
+        fitter._changed.add(('Lorenzian', 1))
+        fitter.updateModel()
+        assert fitter._updates < fitter.resum
+
+    expected = np.zeros(np.shape(fitter.y))
+    for key in fitter.functions.keys():
+        for element in fitter.functions[key][2]:
+            element.calculated = False
+            expected = expected + element.returnData(fitter.x)
+    assert np.array_equal(fitter.constructor(), expected)
@@ -0,0 +1,64 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import numpy as np
+
+from simpleplot.core.data.data_structure import DataStructure
+from simpleplot.core.data.fit_data_injector import FitDataInjector
+
+def build(offset = 0.):
+    '''
+    A 4 x 3 structure of objects of 50 points.
+    '''
+    data = DataStructure()
+    for i in range(4):
+        for j in range(3):
+            data.addDataObject(np.arange(50.) + 100 * i + 10 * j + offset, [i, j])
+    data.validate()
+    return data
+
+def injector():
+    data_injector = FitDataInjector()
+    data_injector.setDataSource(build())
+    data_injector.setBehavior([
+        ['[ dim_1 ]', 'Variable 0', 0], 
+        ['[ dim_2 ]', 'Variable 1', 0], 
+        ['Data axis n. 0', 'x', 0]],
+        ['x', 'Variable 0', 'Variable 1'])
+    return data_injector
+
+def test_rays_of_the_source():
+    data_injector = injector()
+    assert len(data_injector.getFitAxes()[0]) == 50
+    assert np.array_equal(data_injector.getData([1, 2]), np.arange(50.) + 120)
+
+def test_errors_are_sliced_like_the_data():
+    data_injector = injector()
+    assert data_injector.getErrors([1, 2]) is None
+
+    data_injector.setErrorSource(build(0.5))
+    assert np.array_equal(data_injector.getErrors([1, 2]), np.arange(50.) + 120.5)
+
+    data_injector.setErrorSource(None)
+    assert data_injector.getErrors([1, 2]) is None
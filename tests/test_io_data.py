@@ -0,0 +1,164 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import numpy as np
+import pytest
+
+from simpleplot.core.data.data_structure import DataStructure
+from simpleplot.core.io.io_data_save import IODataSave
+from simpleplot.core.io.io_data_import import IODataLoad
+
+def build(first_axis = None):
+    '''
+    A 4 x 3 structure of objects of 5 points with
+    a metadata row each.
+    '''
+    data = DataStructure()
+    for i in range(4):
+        for j in range(3):
+            data.addDataObject(
+                np.arange(5.) + 10 * i + j, [i, j], axes = np.arange(5) * 0.5)
+    data.validate()
+    for k, element in enumerate(data.DataObjects):
+        data.addMetadataObject({
+            'T'     : ['T', 'float', str(k * 0.1), 'K'],
+            'name'  : ['name', 'str', 's' + str(k), '-']})
+        element.meta_address.append(k)
+
+    data.axes.set_name(0, name = 'Temp')
+    data.axes.set_name(1, name = 'Field')
+    data.axes.set_unit(0, unit = 'K')
+    data.axes.set_unit(1, unit = 'T')
+    if not first_axis is None:
+        data.axes.set_axis(0, axis = first_axis)
+    return data
+
+def test_binary_round_trip(tmp_path):
+    data = build()
+    path = str(tmp_path / 'out')
+    IODataSave(data, path).save('npz')
+
+    loaded = DataStructure()
+    IODataLoad(loaded, path).load('npz')
+    assert np.array_equal(loaded.returnAsNumpy(), data.returnAsNumpy())
+    assert loaded.axes.names == ['Temp', 'Field']
+    assert loaded.axes.units == ['K', 'T']
+    assert loaded.get_metaDataObject(4).metadata == data.get_metaDataObject(4).metadata
+
+def test_binary_round_trip_of_string_axes(tmp_path):
+    data = build(first_axis = ['a', 'b', 'c', 'd'])
+    path = str(tmp_path / 'out')
+    IODataSave(data, path).save('npz')
+
+    loaded = DataStructure()
+    IODataLoad(loaded, path).load('npz')
+    assert list(loaded.axes.axes[0]) == ['a', 'b', 'c', 'd']
+    assert [float(e) for e in loaded.axes.axes[1]] == [0., 1., 2.]
+    assert np.array_equal(loaded.returnAsNumpy(), data.returnAsNumpy())
+
+def test_binary_slice_read(tmp_path):
+    data = build()
+    path = str(tmp_path / 'out')
+    IODataSave(data, path).save('npz')
+
+    part = IODataLoad(None, path).readSlice((2, slice(None), slice(0, 2)))
+    assert np.array_equal(part, data.returnAsNumpy()[2, :, :2])
+
+def test_text_round_trip(tmp_path):
+    data = build()
+    path = str(tmp_path / 'out')
+    IODataSave(data, path).save('txt')
+
+    loaded = DataStructure()
+    IODataLoad(loaded, path + '.txt').load('txt')
+    assert np.array_equal(loaded.returnAsNumpy(), data.returnAsNumpy())
+    assert loaded.axes.names == ['Temp', 'Field']
+
+def test_truncated_text_file_is_not_loaded(tmp_path, capsys):
+    data = build()
+    path = str(tmp_path / 'out')
+    IODataSave(data, path).save('txt')
+    with open(path + '.txt', 'r') as f:
+        lines = f.readlines()
+    with open(path + '.txt', 'w') as f:
+        f.writelines(lines[:-3])
+
+    loaded = DataStructure()
+    IODataLoad(loaded, path + '.txt').load('txt')
+    assert "does not match" in capsys.readouterr().out
+    assert loaded.axes is None
+
+def test_malformed_text_axis_fails(tmp_path):
+    data = build()
+    path = str(tmp_path / 'out')
+    IODataSave(data, path).save('txt')
+    with open(path + '.txt', 'r') as f:
+        text = f.read()
+    assert '**K**0,' in text
+    with open(path + '.txt', 'w') as f:
+        f.write(text.replace('**K**0,', '**K**0,x', 1))
+
+    with pytest.raises(ValueError):
+        IODataLoad(DataStructure(), path + '.txt').load('txt')
+
+def test_text_float_format(tmp_path):
+    data = DataStructure()
+    for i in range(2):
+        data.addDataObject(np.array([1. / 3., 2. / 3.]) + i, [i])
+    data.validate()
+    data.axes.set_name(0, name = 'Temp')
+    data.axes.set_unit(0, unit = 'K')
+    path = str(tmp_path / 'out')
+
+    IODataSave(data, path).save('txt')
+    loaded = DataStructure()
+    IODataLoad(loaded, path + '.txt').load('txt')
+    assert np.array_equal(loaded.returnAsNumpy(), data.returnAsNumpy())
+
+    IODataSave(data, path, float_format = '%.3f').save('txt')
+    loaded = DataStructure()
+    IODataLoad(loaded, path + '.txt').load('txt')
+    assert np.allclose(loaded.returnAsNumpy(), [[0.333, 0.667], [1.333, 1.667]])
+
+@pytest.mark.parametrize('extension', ['npy', 'npz'])
+def test_numpy_import_maps_the_file(tmp_path, extension):
+    array = np.random.rand(5, 3, 4)
+    path = str(tmp_path / ('array.' + extension))
+    if extension == 'npy':
+        np.save(path, array)
+    else:
+        np.savez(path, array)
+
+    loader = IODataLoad(DataStructure(), path)
+    assert loader.previewFromNumpy() == (5, 3, 4)
+    loader.loadFromNumpy([False, True, True])
+    loaded = loader._target.returnAsNumpy()
+    assert isinstance(loaded, np.memmap)
+    assert np.array_equal(loaded, np.transpose(array, (1, 2, 0)))
+
+    loaded[0, 0, 0] = -1.
+    stored = np.load(path)
+    if extension == 'npz':
+        stored = stored['arr_0']
+    assert np.array_equal(stored, array)
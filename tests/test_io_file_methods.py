@@ -0,0 +1,67 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import os
+
+from simpleplot.core.io import io_file_methods as file_methods
+
+def test_common_substrings_of_numbered_names():
+    names = ['scan_Temp_1_Field_2.txt', 'scan_Temp_3_Field_4.txt']
+    assert file_methods.get_common_substrings(names) == ['scan_Temp_', '_Field_']
+
+def test_common_substrings_keep_prefix_of_changing_text():
+    names = ['sample-A_100.txt', 'sample-B_101.txt']
+    assert file_methods.get_common_substrings(names)[0] == 'sample-'
+    assert file_methods.get_common_substrings(names) == ['sample-', '_']
+
+def test_common_substrings_suffix_does_not_overlap_prefix():
+    names = ['ab1.txt', 'abab2.txt']
+    assert file_methods.get_common_substrings(names) == ['ab']
+
+def test_common_substrings_fall_back_on_different_layouts():
+    names = ['measurement_1.txt', 'measurement_1_2.txt']
+    assert file_methods.get_common_substrings(names) == (
+        file_methods._search_common_substrings(names))
+
+def test_common_substrings_use_the_file_names():
+    paths = [os.path.join('a', 'b', 'run_1.txt'), os.path.join('c', 'run_2.txt')]
+    assert file_methods.get_common_substrings(paths) == ['run_']
+
+def test_directory_index_refreshes_on_change(tmp_path):
+    open(str(tmp_path / 'a.txt'), 'w').close()
+    assert len(file_methods.get_files_in_folder(str(tmp_path), '.txt')) == 1
+
+    open(str(tmp_path / 'b.txt'), 'w').close()
+    os.utime(str(tmp_path), ns = (0, os.stat(str(tmp_path)).st_mtime_ns + 10**9))
+    assert len(file_methods.get_files_in_folder(str(tmp_path), '.txt')) == 2
+
+def test_directory_index_rejects_missing_folder(tmp_path):
+    assert file_methods.get_files_in_folder(str(tmp_path / 'missing'), '.txt') is False
+
+def test_variable_parts_follow_the_separators_in_order():
+    names = ['data_1_5.txt', 'data_2_6.txt']
+    substrings = file_methods.get_common_substrings(names)
+    assert substrings == ['data_', '_']
+    assert file_methods.get_variable_parts(names[1], substrings, '.txt') == ['2', '6']
+    assert file_methods.get_variable_parts(names[1], substrings) == ['2']
@@ -0,0 +1,69 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import os
+
+import numpy as np
+
+from simpleplot.core.data.data_structure import DataStructure
+from simpleplot.core.io.io_raw_import import IORawHandler, IORawWorker
+
+def write_files(folder, names):
+    x = np.arange(5.)
+    for k, name in enumerate(names):
+        np.savetxt(str(folder / name), np.stack([x, x + 10 * k], axis = 1))
+
+def test_underscore_separated_dimensions(tmp_path):
+    names = ['data_1_5.txt', 'data_1_6.txt', 'data_2_5.txt', 'data_2_6.txt']
+    write_files(tmp_path, names)
+
+    handler = IORawHandler()
+    handler.init_raw_import()
+    handler.set_import_directory(str(tmp_path))
+    handler.scan_directory()
+    handler.evaluate_files()
+
+    assert len(handler.dimension_list) == 2
+    order = [os.path.basename(path) for path in handler.file_list]
+    assert handler.dimension_list[0][5] == [float(name[5]) for name in order]
+    assert handler.dimension_list[1][5] == [float(name[7]) for name in order]
+
+    data = DataStructure()
+    assert handler.process_import(data)
+    assert data.axes.axes == [[1., 2.], [5., 6.]]
+    for k, name in enumerate(names):
+        position = [[1., 2.].index(float(name[5])), [5., 6.].index(float(name[7]))]
+        assert np.allclose(data.returnAsNumpy()[tuple(position)], np.arange(5.) + 10 * k)
+
+def test_parallel_reads_keep_the_file_order(tmp_path):
+    names = ['run_' + str(k) + '.txt' for k in range(12)]
+    write_files(tmp_path, names)
+    paths = [str(tmp_path / name) for name in names]
+
+    for processes in [False, True]:
+        worker = IORawWorker(paths, [], '', workers = 2, processes = processes)
+        output = worker._read()
+        assert len(output) == 12
+        for k, (x, y) in enumerate(output):
+            assert np.allclose(y, np.arange(5.) + 10 * k)
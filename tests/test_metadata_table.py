@@ -0,0 +1,79 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import numpy as np
+
+from simpleplot.core.data.metadata_table import MetadataTable
+
+def build():
+    table = MetadataTable()
+    for i in range(4):
+        table.add({
+            'T'     : ['T', 'float', str(1.5 * i), 'K'],
+            'count' : ['count', 'int', str(i + 1), '-'],
+            'name'  : ['name', 'str', 'run' + str(i), '-']})
+    return table
+
+def test_rows_are_typed_columns():
+    table = build()
+    assert len(table) == 4
+    assert table.columns['T'].dtype == np.float64
+    assert table.columns['count'].dtype == np.int64
+    assert table.value(2, 'count') == 3
+    assert table.row(1)['name'] == ['name', 'str', 'run1', '-']
+
+def test_missing_keys_are_masked():
+    table = build()
+    table.add({'T' : ['T', 'float', '9', 'K']})
+    values, present = table.column('count')
+    assert list(present) == [True, True, True, True, False]
+    assert not 'count' in table.row(4)
+
+def test_average_promotes_int_columns():
+    table = build()
+    averaged = table.average(np.arange(4), [0, 2])
+    assert np.allclose(averaged.columns['count'], [1.5, 3.5])
+    assert averaged.types['count'] == 'float'
+    assert np.allclose(averaged.columns['T'], [0.75, 3.75])
+    assert list(averaged.columns['name']) == ['run0', 'run2']
+
+def test_average_keeps_discrete_int_columns():
+    table = build()
+    averaged = table.average(np.arange(4), [0, 2], discrete = ['count'])
+    assert averaged.columns['count'].dtype == np.int64
+    assert averaged.types['count'] == 'int'
+    assert list(averaged.columns['count']) == [2, 4]
+
+def test_average_ignores_missing_rows():
+    table = build()
+    averaged = table.average(np.array([0, -1, 2, 3]), [0, 2])
+    assert np.allclose(averaged.columns['count'], [1., 3.5])
+
+def test_take_and_extend():
+    table = build()
+    taken = table.take([3, 0])
+    assert list(taken.columns['name']) == ['run3', 'run0']
+    taken.extend(build())
+    assert len(taken) == 6
+    assert taken.value(5, 'count') == 4
@@ -0,0 +1,54 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import numpy as np
+
+from simpleplot.core.data.data_structure import DataStructure
+from simpleplot.ploting.plot_data_types.plot_data import PlotData, setDefaultDtype
+
+def test_owned_float_arrays_are_kept():
+    value = np.arange(5.)
+    assert PlotData()._asArray(value) is value
+    assert PlotData()._asArray([1, 2]).dtype == np.dtype('float64')
+
+def test_dtype_policy_converts():
+    value = np.arange(5.)
+    assert PlotData(dtype = 'float32')._asArray(value).dtype == np.dtype('float32')
+    setDefaultDtype('float16')
+    try:
+        assert PlotData()._asArray(value).dtype == np.dtype('float16')
+    finally:
+        setDefaultDtype(None)
+
+def test_slices_of_a_structure_buffer_are_copied():
+    data = DataStructure()
+    data.setDenseStorage(True)
+    for i in range(3):
+        data.addDataObject(np.zeros(4) + i, [i])
+    data.validate()
+
+    value = PlotData()._asArray(data.returnSliceAsNumpy([1]))
+    assert not np.shares_memory(value, data.returnAsNumpy())
+    data.returnAsNumpy()[1] = 7.
+    assert np.all(value == 1.)
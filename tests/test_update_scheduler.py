@@ -0,0 +1,104 @@
+#  -*- coding: utf-8 -*-
+# *****************************************************************************
+# Copyright (c) 2017 by the NSE analysis contributors (see AUTHORS)
+#
+# This program is free software; you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 2 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE.  See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program; if not, write to the Free Software Foundation, Inc.,
+# 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+# Module authors:
+#   Alexander Schober <alex.schober@mac.com>
+#
+# *****************************************************************************
+
+
+import threading
+
+import pytest
+from PyQt5 import QtCore, QtWidgets
+
+from simpleplot.core.data.update_scheduler import UpdateScheduler
+
+@pytest.fixture(scope = 'module')
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+def wait_for(condition, timeout = 5000):
+    '''
+    Run the event loop until the condition holds.
+    '''
+    timer = QtCore.QElapsedTimer()
+    timer.start()
+    while not condition() and timer.elapsed() < timeout:
+        QtCore.QCoreApplication.processEvents(QtCore.QEventLoop.AllEvents, 10)
+    return condition()
+
+def test_requests_are_coalesced(app):
+    computed = []
+    delivered = []
+    scheduler = UpdateScheduler(
+        lambda cancelled, value: computed.append(value) or value, 
+        delivered.append, interval = 50)
+    for value in range(5):
+        scheduler.request(value)
+
+    assert wait_for(lambda: delivered == [4])
+    assert computed == [4]
+
+def test_continuous_requests_are_delivered_once_per_interval(app):
+    delivered = []
+    scheduler = UpdateScheduler(
+        lambda cancelled, value: value, delivered.append, interval = 50)
+
+    timer = QtCore.QElapsedTimer()
+    timer.start()
+    value = 0
+    while timer.elapsed() < 400:
+        scheduler.request(value)
+        value += 1
+        QtCore.QCoreApplication.processEvents(QtCore.QEventLoop.AllEvents, 5)
+        QtCore.QThread.msleep(5)
+    streamed = len(delivered)
+
+    assert streamed >= 2
+    assert delivered == sorted(delivered)
+    assert wait_for(lambda: delivered[-1] == value - 1)
+
+def test_superseded_results_are_dropped(app):
+    release = threading.Event()
+    started = threading.Event()
+    emitted = []
+    delivered = []
+
+    def compute(cancelled, value):
+        if value == 0:
+            started.set()
+            release.wait(5)
+        return value
+
+    scheduler = UpdateScheduler(compute, delivered.append, interval = 0)
+    scheduler.finished.connect(lambda generation, result: emitted.append(result))
+    scheduler.request(0)
+    assert wait_for(started.is_set)
+    scheduler.request(1)
+    release.set()
+
+    assert wait_for(lambda: delivered == [1])
+    assert emitted[0] is None
+
+def test_without_application_requests_are_synchronous():
+    delivered = []
+    scheduler = UpdateScheduler(lambda cancelled, value: value, delivered.append)
+    scheduler.synchronous = True
+    scheduler.request(3)
+    assert delivered == [3]